@@ -4,43 +4,78 @@ Interview Copilot - Main Application
 Real-time interview assistant using local LLM and speech recognition.
 Enhanced with manual controls and real-time transcription preview.
 """
+from __future__ import annotations
+
 import sys
+import asyncio
+import atexit
+import importlib
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
 import signal
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+# Heavy components (Flet, Ollama, PyAudio, Vosk) are imported in initialize()
 from src.config_loader import ConfigLoader
-from src.llm_client import LLMClient
-from src.audio_handler import AudioHandler
-from src.gui import CopilotGUI, TranscriptionState
-from src.session_manager import SessionManager, InterviewSession
-from src.gemini_client import GeminiClient
+from src.transcription_state import TranscriptionState
+
+if TYPE_CHECKING:
+    from src.llm_client import LLMClient
+    from src.audio_handler import AudioHandler
+    from src.gui import CopilotGUI
+    from src.session_manager import SessionManager
+    from src.gemini_client import GeminiClient
 
 
-# Configure logging with rotation
+# Configure logging with rotation. Records are handed to a listener thread
+# through a queue, so audio/Vosk callbacks only pay for an enqueue and never
+# block on file or console I/O.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_file_handler = RotatingFileHandler(
+    'interview_copilot.log',
+    maxBytes=10*1024*1024,  # 10MB
+    backupCount=5,
+    encoding='utf-8'
+)
+_console_handler = logging.StreamHandler()
+_file_handler.setFormatter(_log_formatter)
+_console_handler.setFormatter(_log_formatter)
+
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, _file_handler, _console_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Final format applied by the listener
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        RotatingFileHandler(
-            'interview_copilot.log',
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
-        ),
-        logging.StreamHandler()
-    ]
+    handlers=[_queue_handler]
 )
 
+# Level for per-transcription messages; filtered out at the default INFO level
+HOT_LEVEL = logging.DEBUG
+
 logger = logging.getLogger(__name__)
 
 
+def _preload_module(name: str) -> None:
+    """Import a module in the background so a later import is a cache hit."""
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass  # Reported by the real import during initialize()
+
+
 class InterviewCopilot:
     """Main application orchestrator with enhanced UX features."""
     
@@ -58,14 +93,48 @@ class InterviewCopilot:
         self.is_processing = False
         self.processing_lock = threading.Lock()
         self.current_buffer = ""
+        self._device_name: Optional[str] = None  # Cached after first successful start
         
-        # Auto-process timer
-        self.auto_process_timer = None
+        # Auto-process deadline (monotonic seconds), checked on the GUI tick
+        self._auto_process_deadline: Optional[float] = None
         self.auto_process_delay = 1500  # ms - delay after last transcription
+        self._last_ts_update = 0.0  # Monotonic time of last timestamp refresh
+        
+        # Endpointing: trigger on a long enough buffer, or on a shorter one
+        # once the partial hypothesis has been stable for silence_ms
+        self.endpoint_min_words = 4
+        self.endpoint_short_min_words = 2
+        self.endpoint_silence = 0.8  # seconds
+        self._last_partial = ""
+        self._last_partial_change_ts = time.monotonic()
+        
+        # Reused worker threads for start/stop requests from the GUI
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="copilot")
+        
+        # shutdown() may be reached from a signal, the GUI exiting and atexit
+        self._shutdown_lock = threading.Lock()
+        self._is_shut_down = False
+        
+        # Dedicated event loop for streaming LLM requests
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            daemon=True,
+            name="LLMStream"
+        )
+        self._loop_thread.start()
         
         logger.info("=" * 60)
         logger.info("Interview Copilot Starting (Enhanced Edition)")
         logger.info("=" * 60)
+        
+        # Load Vosk while the configuration is being read
+        threading.Thread(
+            target=_preload_module,
+            args=("vosk",),
+            daemon=True,
+            name="VoskPreload"
+        ).start()
     
     def initialize(self) -> bool:
         """
@@ -83,6 +152,7 @@ class InterviewCopilot:
             
             # 2. Initialize LLM client
             logger.info("[2/5] Initializing LLM client...")
+            from src.llm_client import LLMClient
             self.llm_client = LLMClient(self.config)
             
             # Test Ollama connection
@@ -93,8 +163,16 @@ class InterviewCopilot:
                 return False
             logger.info("Ollama connected")
             
+            # Load the model in the background while the GUI is built
+            threading.Thread(
+                target=self.llm_client.warmup,
+                daemon=True,
+                name="LLMWarmup"
+            ).start()
+            
             # 2.5. Initialize Gemini client (optional enhancement)
             logger.info("[2.5/7] Initializing Gemini client...")
+            from src.gemini_client import GeminiClient
             self.gemini_client = GeminiClient(self.config)
             if self.gemini_client.is_available():
                 logger.info("Gemini client ready (hybrid mode enabled)")
@@ -103,6 +181,7 @@ class InterviewCopilot:
             
             # 3. Initialize GUI first (we need it for callbacks)
             logger.info("[3/5] Initializing GUI...")
+            from src.gui import CopilotGUI
             gui_settings = self.config_loader.get_gui_settings()
             self.gui = CopilotGUI(gui_settings)
             self.gui.create_window()
@@ -112,6 +191,8 @@ class InterviewCopilot:
             self.gui.on_start_listening = self._handle_start_listening
             self.gui.on_stop_listening = self._handle_stop_listening
             self.gui.on_clear_buffer = self._handle_clear_buffer
+            self.gui.on_tick = self._on_gui_tick
+            self.gui.on_app_ready = self._on_app_ready
             
             # Wire up session callbacks
             self.gui.on_start_session = self._handle_start_session
@@ -122,6 +203,7 @@ class InterviewCopilot:
             
             # 4. Initialize audio handler with callbacks
             logger.info("[4/5] Initializing audio handler...")
+            from src.audio_handler import AudioHandler
             audio_settings = self.config.get("audio_settings", {})
             use_system_audio = audio_settings.get("use_system_audio", False)
             
@@ -130,16 +212,24 @@ class InterviewCopilot:
             transcription_engine = transcription_settings.get("engine", "vosk")
             vosk_model_size = transcription_settings.get("vosk_model", "small")
             use_google_refinement = transcription_settings.get("use_google_refinement", False)
+            vosk_grammar = transcription_settings.get("grammar_phrases")
+            
+            endpointing = transcription_settings.get("endpointing", {})
+            self.endpoint_min_words = endpointing.get("min_words", self.endpoint_min_words)
+            self.endpoint_short_min_words = endpointing.get(
+                "short_min_words", self.endpoint_short_min_words
+            )
+            self.endpoint_silence = endpointing.get("silence_ms", 800) / 1000.0
             
             self.audio_handler = AudioHandler(
                 callback=self._on_transcription,
                 use_system_audio=use_system_audio,
                 on_listening_start=self._on_listening_start,
-                on_audio_received=self._on_audio_received,
                 on_partial_transcription=self._on_partial_transcription,
                 transcription_engine=transcription_engine,
                 vosk_model_size=vosk_model_size,
-                use_google_refinement=use_google_refinement
+                use_google_refinement=use_google_refinement,
+                vosk_grammar=vosk_grammar
             )
             
             # Test microphone
@@ -154,6 +244,7 @@ class InterviewCopilot:
             
             # 6. Initialize session manager with defaults from config
             logger.info("[6/7] Initializing session manager...")
+            from src.session_manager import SessionManager
             self.session_manager = SessionManager(
                 default_system_instruction=self.config.get("system_instruction", "")
             )
@@ -212,11 +303,6 @@ class InterviewCopilot:
         if self.gui:
             self.gui.set_state_safe(TranscriptionState.LISTENING)
     
-    def _on_audio_received(self) -> None:
-        """Callback when audio is detected (before transcription)."""
-        # This could be used for a visual "hearing audio" indicator
-        pass
-    
     def _on_partial_transcription(self, partial_text: str) -> None:
         """
         Callback for real-time partial transcription updates from Vosk.
@@ -225,6 +311,10 @@ class InterviewCopilot:
         Args:
             partial_text: Current partial transcription (may be incomplete)
         """
+        if partial_text != self._last_partial:
+            self._last_partial = partial_text
+            self._last_partial_change_ts = time.monotonic()
+        
         if self.gui:
             self.gui.update_live_transcription_safe(partial_text)
     
@@ -236,7 +326,7 @@ class InterviewCopilot:
         Args:
             transcribed_text: The transcribed text chunk
         """
-        logger.info(f"Transcription received: {transcribed_text}")
+        logger.log(HOT_LEVEL, "Transcription received: %s", transcribed_text)
         
         if self.gui:
             self._update_live_preview()
@@ -254,26 +344,27 @@ class InterviewCopilot:
         buffer_text = self.audio_handler.get_buffer_text()
         self.current_buffer = buffer_text
         
-        # Update live preview
+        # Update live preview (coalesced by the GUI tick)
         self.gui.update_live_transcription_safe(buffer_text)
-        self.gui.set_state_safe(TranscriptionState.LISTENING)
-        self.gui.update_timestamp()
+        if self.gui.current_state != TranscriptionState.LISTENING:
+            self.gui.set_state_safe(TranscriptionState.LISTENING)
+        
+        # Timestamp only has second resolution; refresh at most once a second
+        now = time.monotonic()
+        if now - self._last_ts_update > 1.0:
+            self._last_ts_update = now
+            self.gui.update_timestamp()
     
     def _schedule_auto_process(self) -> None:
-        """Schedule auto-process check after delay."""
-        import threading
-        
-        # Cancel existing timer
-        if self.auto_process_timer:
-            self.auto_process_timer.cancel()
-        
-        # Schedule new check
-        self.auto_process_timer = threading.Timer(
-            self.auto_process_delay / 1000.0,  # Convert ms to seconds
-            self._check_auto_process
-        )
-        self.auto_process_timer.daemon = True
-        self.auto_process_timer.start()
+        """Push the auto-process check back to delay after the latest transcription."""
+        self._auto_process_deadline = time.monotonic() + self.auto_process_delay / 1000.0
+    
+    def _on_gui_tick(self) -> None:
+        """Run the auto-process check once its deadline has passed (GUI thread)."""
+        deadline = self._auto_process_deadline
+        if deadline is not None and time.monotonic() >= deadline:
+            self._auto_process_deadline = None
+            self._check_auto_process()
     
     def _check_auto_process(self) -> None:
         """Check if we should auto-process based on buffer content."""
@@ -281,10 +372,18 @@ class InterviewCopilot:
             return
         
         word_count = self.audio_handler.get_buffer_word_count()
-        
-        # Auto-process if we have 4+ words (likely a complete question)
-        if word_count >= 4:
-            logger.info(f"Auto-processing: {word_count} words in buffer")
+        stable_for = time.monotonic() - self._last_partial_change_ts
+        
+        # Auto-process a likely complete question, or a short one once the
+        # speaker has gone quiet (partial hypothesis stopped changing)
+        if word_count >= self.endpoint_min_words or (
+            word_count >= self.endpoint_short_min_words and
+            stable_for > self.endpoint_silence
+        ):
+            logger.log(
+                HOT_LEVEL, "Auto-processing: %d words in buffer, stable for %.2fs",
+                word_count, stable_for
+            )
             self._handle_process_now()
     
     def _handle_process_now(self) -> None:
@@ -316,19 +415,14 @@ class InterviewCopilot:
                 self.is_processing = False
                 return
             
-            logger.info(f"Processing manually triggered text: {text}")
+            logger.info("Processing manually triggered text: %s", text)
             
             # Update GUI state
             self.gui.set_state(TranscriptionState.TRANSCRIBING)
             self.gui.update_live_transcription("")
             
-            # Process in a separate thread to avoid blocking UI
-            thread = threading.Thread(
-                target=self._process_question,
-                args=(text,),
-                daemon=True
-            )
-            thread.start()
+            # Stream the answer on the LLM event loop to avoid blocking UI
+            self._process_question(text)
             
         except Exception as e:
             logger.error(f"Error in process_now: {e}")
@@ -339,11 +433,24 @@ class InterviewCopilot:
     
     def _process_question(self, question_text: str) -> None:
         """
-        Process question and generate answer (runs in thread).
+        Schedule question processing on the LLM event loop.
         
         Args:
             question_text: The transcribed question
         """
+        asyncio.run_coroutine_threadsafe(
+            self._stream_question(question_text),
+            self._loop
+        )
+    
+    async def _stream_question(self, question_text: str) -> None:
+        """
+        Stream the answer for a question into the GUI (runs on LLM loop).
+        
+        Args:
+            question_text: The transcribed question
+        """
+        parts = []
         try:
             if not self.gui or not self.llm_client or not self.session_manager:
                 return
@@ -358,23 +465,22 @@ class InterviewCopilot:
                 self.gui.show_error_safe("No active session")
                 return
             
-            # Generate answer using session context (ZERO re-processing)
-            answer = self.llm_client.generate_answer_with_session(session, question_text)
+            # Stream answer tokens using session context (ZERO re-processing)
+            async for token in self.llm_client.stream_answer_with_session(session, question_text):
+                if not parts:
+                    self.gui.start_answer_stream_safe(question_text)
+                parts.append(token)
+                self.gui.append_answer_token_safe(token)
             
+            answer = "".join(parts).strip()
             if answer:
                 self._display_result(question_text, answer)
-                # Save session after each Q&A to persist conversation history
-                self.session_manager.save_session()
                 
                 # Trigger Gemini in background for enhanced answer
                 if self.gemini_client and self.gemini_client.is_available():
                     logger.info("Starting Gemini background generation...")
-                    self.gemini_client.generate_answer_async(
-                        session,
-                        question_text,
-                        callback=self._on_gemini_answer_ready,
-                        error_callback=lambda e: logger.warning(f"Gemini failed: {e}")
-                    )
+                    future = self.gemini_client.generate_answer_async(session, question_text)
+                    future.add_done_callback(self._on_gemini_answer_ready)
             else:
                 self._display_not_question(question_text)
                 
@@ -383,6 +489,9 @@ class InterviewCopilot:
             if self.gui:
                 self.gui.show_error_safe(str(e))
         finally:
+            # Save session after each Q&A to persist conversation history
+            if parts and self.session_manager:
+                self.session_manager.save_session()
             self.is_processing = False
     
     def _display_result(self, question: str, answer: str) -> None:
@@ -391,14 +500,24 @@ class InterviewCopilot:
             self.gui.display_question_answer_safe(question, answer)
             logger.info("Result displayed successfully")
     
-    def _on_gemini_answer_ready(self, enhanced_answer: str) -> None:
+    def _on_gemini_answer_ready(self, future: Future[Optional[str]]) -> None:
         """
-        Callback when Gemini finishes generating enhanced answer.
+        Done callback when Gemini finishes generating enhanced answer.
         Shows notification banner in GUI.
         
         Args:
-            enhanced_answer: The enhanced answer from Gemini
+            future: Gemini request future holding the enhanced answer
         """
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Gemini failed: {error}")
+            return
+        enhanced_answer = future.result()
+        if not enhanced_answer:
+            logger.warning("Gemini failed: Empty response from Gemini")
+            return
         logger.info(f"Gemini answer ready: {enhanced_answer[:50]}...")
         if self.gui:
             self.gui.show_enhanced_answer_ready_safe(enhanced_answer)
@@ -484,15 +603,16 @@ class InterviewCopilot:
             success = self.audio_handler.start_listening()
             if success:
                 self.gui.set_state_safe(TranscriptionState.LISTENING)
-                device_info = self.audio_handler.get_device_info()
-                self.gui.update_status_safe(f"Listening - {device_info['name']}")
+                if self._device_name is None:
+                    self._device_name = self.audio_handler.get_device_info()['name']
+                self.gui.update_status_safe(f"Listening - {self._device_name}")
                 logger.info("Audio capture started")
             else:
                 self.gui.show_error_safe("Failed to start listening")
                 logger.error("Failed to start audio capture")
         
-        # Start in background thread
-        threading.Thread(target=do_start, daemon=True).start()
+        # Start on a background worker
+        self._executor.submit(do_start)
     
     def _handle_stop_listening(self) -> None:
         """Handle stop listening request."""
@@ -507,8 +627,8 @@ class InterviewCopilot:
             self.gui.update_status_safe("Stopped")
             logger.info("Audio capture stopped")
         
-        # Stop in background thread
-        threading.Thread(target=do_stop, daemon=True).start()
+        # Stop on a background worker
+        self._executor.submit(do_stop)
     
     def _handle_clear_buffer(self) -> None:
         """Handle clear buffer request."""
@@ -524,9 +644,8 @@ class InterviewCopilot:
             logger.error("Initialization failed. Exiting.")
             sys.exit(1)
         
-        # Set up signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        # Cover exit paths that bypass the GUI loop (e.g. Ctrl-C during startup)
+        atexit.register(self.shutdown)
         
         # Run GUI main loop (blocks until window closed)
         try:
@@ -535,11 +654,44 @@ class InterviewCopilot:
             self.shutdown()
     
     def shutdown(self) -> None:
-        """Clean shutdown of all components."""
+        """Clean shutdown of all components (safe to call more than once)."""
+        with self._shutdown_lock:
+            if self._is_shut_down:
+                return
+            self._is_shut_down = True
+        
         logger.info("Shutting down...")
         
         if self.audio_handler:
-            self.audio_handler.stop_listening()
+            self.audio_handler.close()
+        
+        # cancel_futures is Python 3.9+
+        if sys.version_info >= (3, 9):
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            self._executor.shutdown(wait=False)
+        
+        # The async Ollama connections belong to the streaming loop, so they
+        # are closed on it before it stops
+        if self.llm_client:
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    self.llm_client.aclose(), self._loop
+                ).result(timeout=1.0)
+            except Exception as e:
+                logger.warning(f"Error closing Ollama connections: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        
+        if self.gemini_client:
+            self.gemini_client.close()
+        
+        # Let a pending session save finish before exiting
+        if self.session_manager:
+            self.session_manager.close()
+        
+        # Release the pinned model; Ollama would otherwise keep it loaded
+        if self.llm_client:
+            self.llm_client.close()
         
         if self.gui and self.gui.page:
             try:
@@ -549,11 +701,32 @@ class InterviewCopilot:
         
         logger.info("Interview Copilot stopped")
     
-    def _signal_handler(self, signum, frame) -> None:
-        """Handle shutdown signals."""
+    def _on_app_ready(self) -> None:
+        """Install signal handling once the Flet event loop is running."""
+        # Flet replaces SIGINT/SIGTERM handlers on startup; handlers must be
+        # installed from the loop's (main) thread
+        loop = self.gui.page.loop
+        loop.call_soon_threadsafe(self._install_signal_handlers, loop)
+    
+    def _install_signal_handlers(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Route SIGINT/SIGTERM to the GUI event loop.
+        
+        add_signal_handler wakes the loop through signal.set_wakeup_fd, so
+        shutdown runs as a normal loop callback instead of interrupting
+        whichever frame the signal happened to land on.
+        """
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self._signal_handler, signum)
+            except (NotImplementedError, RuntimeError, ValueError) as e:
+                # Not supported on Windows event loops; keep Flet's handlers
+                logger.debug("Signal handler not installed for %s: %s", signum, e)
+    
+    def _signal_handler(self, signum: int) -> None:
+        """Handle shutdown signals on the GUI event loop."""
         logger.info(f"Received signal {signum}")
         self.shutdown()
-        sys.exit(0)
 
 
 def main():
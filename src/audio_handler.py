@@ -3,22 +3,78 @@ Audio handler for Interview Copilot.
 Captures and transcribes audio using Vosk (real-time) with optional Google fallback.
 Enhanced with buffer management and restart capabilities.
 """
-import speech_recognition as sr
+import ctypes
+import ctypes.util
 import logging
-import queue
+import os
+import sys
 import threading
 import pyaudio
 import time
-from typing import Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 
-from src.vosk_handler import VoskStreamHandler
+from src.vosk_handler import MODEL_SAMPLE_RATE, VoskStreamHandler
+
+try:
+    import audioop  # Deprecated since 3.11, removed in 3.13
+    AUDIOOP_AVAILABLE = True
+except ImportError:
+    AUDIOOP_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 # Audio settings for Vosk (16kHz mono is optimal)
-VOSK_SAMPLE_RATE = 16000
+VOSK_SAMPLE_RATE = MODEL_SAMPLE_RATE
 VOSK_CHANNELS = 1
 VOSK_CHUNK_SIZE = 4000  # ~250ms of audio at 16kHz
+VOSK_CHUNK_BYTES = VOSK_CHUNK_SIZE * 2  # 16-bit samples
+VOSK_FEED_BYTES = VOSK_CHUNK_BYTES * 2  # Feed Vosk ~500ms at a time
+# Capture ring holds ~4s of audio; its size must be a multiple of
+# VOSK_FEED_BYTES so a feed window never wraps around the end
+RING_CHUNKS = 16
+PARTIAL_MIN_INTERVAL = 0.3  # Seconds between partial transcription updates
+
+# Force a Vosk final after this much silence instead of waiting for its
+# internal endpointer (1.5-2.5s); loudness is measured per ~250ms chunk, so
+# silence is counted in CHUNK_SECONDS steps rather than whole feed windows
+SILENCE_RMS_THRESHOLD = 300
+SILENCE_FINAL_SECONDS = 0.7
+CHUNK_SECONDS = VOSK_CHUNK_BYTES / 2 / VOSK_SAMPLE_RATE
+
+# Lowercased device name -> (index, name); PortAudio devices are enumerated
+# once per process and cleared only when listening is restarted
+_DEVICE_INDEX_BY_NAME: Dict[str, Tuple[int, str]] = {}
+
+
+# macOS QoS class for latency-critical work (from <sys/qos.h>)
+QOS_CLASS_USER_INTERACTIVE = 0x21
+
+
+def _raise_thread_priority() -> None:
+    """
+    Best-effort priority boost for the calling (audio consumer) thread.
+    
+    macOS: QOS_CLASS_USER_INTERACTIVE. Linux: SCHED_FIFO, which needs
+    CAP_SYS_NICE; without it the thread keeps its normal priority.
+    """
+    try:
+        if sys.platform == "darwin":
+            libc = ctypes.CDLL(ctypes.util.find_library("c"))
+            libc.pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0)
+        elif hasattr(os, "sched_setscheduler"):
+            # pid 0 targets the calling thread on Linux
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+    except (OSError, AttributeError) as e:
+        logger.debug(f"Could not raise audio thread priority: {e}")
+
+
+def _get_device_index_by_name(pa: pyaudio.PyAudio) -> Dict[str, Tuple[int, str]]:
+    """Return the device name cache, enumerating devices on first use."""
+    if not _DEVICE_INDEX_BY_NAME:
+        for i in range(pa.get_device_count()):
+            name = str(pa.get_device_info_by_index(i).get('name', ''))
+            _DEVICE_INDEX_BY_NAME.setdefault(name.lower(), (i, name))
+    return _DEVICE_INDEX_BY_NAME
 
 
 class AudioHandler:
@@ -29,11 +85,11 @@ class AudioHandler:
         callback: Optional[Callable[[str], None]] = None,
         use_system_audio: bool = True,
         on_listening_start: Optional[Callable[[], None]] = None,
-        on_audio_received: Optional[Callable[[], None]] = None,
         on_partial_transcription: Optional[Callable[[str], None]] = None,
         transcription_engine: str = "vosk",
         vosk_model_size: str = "small",
-        use_google_refinement: bool = False
+        use_google_refinement: bool = False,
+        vosk_grammar: Optional[List[str]] = None
     ):
         """
         Initialize audio handler.
@@ -42,15 +98,14 @@ class AudioHandler:
             callback: Function to call when final transcription is ready
             use_system_audio: If True, try to use BlackHole for system audio capture
             on_listening_start: Callback when listening starts/resumes
-            on_audio_received: Callback when audio is detected (for UI feedback)
             on_partial_transcription: Callback for real-time partial transcriptions
             transcription_engine: "vosk", "google", or "hybrid"
             vosk_model_size: "small" (~50MB) or "large" (~1.8GB)
             use_google_refinement: If True, refine Vosk results with Google
+            vosk_grammar: Optional phrase list to constrain Vosk decoding
         """
         self.callback = callback
         self.on_listening_start = on_listening_start
-        self.on_audio_received = on_audio_received
         self.on_partial_transcription = on_partial_transcription
         self.use_system_audio = use_system_audio
         
@@ -58,6 +113,7 @@ class AudioHandler:
         self.transcription_engine = transcription_engine
         self.vosk_model_size = vosk_model_size
         self.use_google_refinement = use_google_refinement
+        self.vosk_grammar = vosk_grammar
         
         # State
         self.is_listening = False
@@ -67,26 +123,57 @@ class AudioHandler:
         # Vosk handler
         self.vosk_handler: Optional[VoskStreamHandler] = None
         
-        # Google recognizer (for fallback)
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = False
+        # Google recognizer (for fallback); speech_recognition is only
+        # imported when an engine that uses it is configured
+        self.recognizer = None
+        if use_google_refinement or transcription_engine in ("google", "hybrid"):
+            self.recognizer = self._create_google_recognizer()
         
-        # Transcription buffer for accumulating results
-        self.transcription_buffer = []
+        # Transcription buffer for accumulating results, kept as one running
+        # string so reads don't re-join every final. The string is immutable
+        # and replaced with a single attribute store, so readers take no lock;
+        # buffer_lock only serializes writers (append vs. pop/clear).
+        self._buffer_text = ""
+        self._buffer_word_count = 0
         self.buffer_lock = threading.Lock()
         self.last_transcription_time = 0
+        self._last_partial_emit = 0.0
+        self._last_partial_sent = ""
         
         # Device info
         self.device_index = None
         self.device_name = "Unknown"
         
+        # BlackHole lookup result; enumeration is slow on CoreAudio, so it
+        # is done once and only repeated by restart_listening()
+        self._cached_device_index: Optional[int] = None
+        self._device_lookup_done = False
+        
         # PyAudio instance
         self._pyaudio: Optional[pyaudio.PyAudio] = None
         self._stream: Optional[pyaudio.Stream] = None
         
+        # Single-producer/single-consumer ring between the PortAudio callback
+        # and the consumer thread. Head and tail are running byte counts; each
+        # is stored by only one thread, so no lock is needed.
+        self._ring = bytearray(RING_CHUNKS * VOSK_CHUNK_BYTES)
+        self._ring_head = 0  # Written by the PortAudio callback
+        self._ring_tail = 0  # Written by the consumer thread
+        self._data_ready = threading.Event()
+        self._overruns = 0
+        
         logger.info(f"Audio handler initialized (engine: {transcription_engine})")
     
+    @staticmethod
+    def _create_google_recognizer():
+        """Create the speech_recognition recognizer used for Google fallback."""
+        import speech_recognition as sr
+        
+        recognizer = sr.Recognizer()
+        recognizer.energy_threshold = 300
+        recognizer.dynamic_energy_threshold = False
+        return recognizer
+    
     def _find_blackhole_device(self) -> Optional[int]:
         """
         Find BlackHole audio device index.
@@ -94,21 +181,30 @@ class AudioHandler:
         Returns:
             Device index if found, None otherwise
         """
+        if self._device_lookup_done:
+            return self._cached_device_index
+        
         try:
             if not self._pyaudio:
                 self._pyaudio = pyaudio.PyAudio()
             
-            for i in range(self._pyaudio.get_device_count()):
-                info = self._pyaudio.get_device_info_by_index(i)
-                device_name = str(info.get('name', '')).lower()
-                
-                if 'blackhole' in device_name:
-                    logger.info(f"Found BlackHole device: {info.get('name')} (index {i})")
-                    self.device_name = str(info.get('name', 'BlackHole'))
-                    return i
+            devices = _get_device_index_by_name(self._pyaudio)
+            match = next(
+                (device for key, device in devices.items() if 'blackhole' in key),
+                None
+            )
+            if match is not None:
+                i, name = match
+                logger.info(f"Found BlackHole device: {name} (index {i})")
+                self.device_name = name or 'BlackHole'
+                self._cached_device_index = i
+                self._device_lookup_done = True
+                return i
             
             logger.warning("BlackHole device not found, using default microphone")
             logger.warning("To capture browser audio, install BlackHole: brew install blackhole-2ch")
+            self._cached_device_index = None
+            self._device_lookup_done = True
             return None
             
         except Exception as e:
@@ -142,28 +238,51 @@ class AudioHandler:
             else:
                 self.device_name = "Default Microphone"
             
-            # Initialize Vosk handler if using Vosk
+            # Initialize Vosk handler if using Vosk; it is kept across
+            # stop/start so its recognizer is reused
             if self.transcription_engine in ("vosk", "hybrid"):
-                self.vosk_handler = VoskStreamHandler(
-                    sample_rate=VOSK_SAMPLE_RATE,
-                    on_partial=self._handle_partial_transcription,
-                    on_final=self._handle_final_transcription,
-                    model_size=self.vosk_model_size
-                )
+                if not self.vosk_handler:
+                    self.vosk_handler = VoskStreamHandler(
+                        sample_rate=VOSK_SAMPLE_RATE,
+                        on_partial=self._handle_partial_transcription,
+                        on_final=self._handle_final_transcription,
+                        model_size=self.vosk_model_size,
+                        grammar=self.vosk_grammar
+                    )
                 
                 if not self.vosk_handler.start(progress_callback):
                     logger.error("Failed to start Vosk handler")
                     return False
             
-            # Start audio capture thread
+            # Open the stream in callback mode; PortAudio pushes blocks into
+            # the ring and the consumer thread feeds them to Vosk
+            self._ring_head = 0
+            self._ring_tail = 0
+            self._overruns = 0
+            self._data_ready.clear()
+            self._stream = self._pyaudio.open(
+                format=pyaudio.paInt16,
+                channels=VOSK_CHANNELS,
+                rate=VOSK_SAMPLE_RATE,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=VOSK_CHUNK_SIZE,
+                stream_callback=self._pa_callback,
+                start=False
+            )
+            
+            # Start audio consumer thread before audio starts flowing
             self._stop_event.clear()
             self._audio_thread = threading.Thread(
-                target=self._audio_capture_loop,
+                target=self._audio_consume_loop,
                 daemon=True,
-                name="AudioCapture"
+                name="AudioConsumer"
             )
             self._audio_thread.start()
             
+            self._stream.start_stream()
+            logger.info("Audio stream opened (device: %s)", self.device_name)
+            
             self.is_listening = True
             
             if self.on_listening_start:
@@ -176,46 +295,89 @@ class AudioHandler:
             logger.error(f"Failed to start listening: {e}", exc_info=True)
             return False
     
-    def _audio_capture_loop(self):
-        """Background thread for capturing audio and feeding to Vosk."""
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """
+        PortAudio callback: copy the block into the ring and return at once.
+        
+        Runs on PortAudio's audio thread, so it never blocks and does no
+        per-block allocation beyond what PyAudio hands in.
+        """
+        size = len(self._ring)
+        n = len(in_data)
+        head = self._ring_head
+        if head - self._ring_tail + n > size:
+            # Consumer fell behind; drop this block rather than block audio
+            self._overruns += 1
+            return (None, pyaudio.paContinue)
+        
+        start = head % size
+        end = start + n
+        if end <= size:
+            self._ring[start:end] = in_data
+        else:
+            split = size - start
+            data = memoryview(in_data)
+            self._ring[start:] = data[:split]
+            self._ring[:n - split] = data[split:]
+        
+        # Publish only after the bytes are in place
+        self._ring_head = head + n
+        self._data_ready.set()
+        return (None, pyaudio.paContinue)
+    
+    def _audio_consume_loop(self):
+        """Background thread draining the capture ring into Vosk."""
+        _raise_thread_priority()
+        ring = memoryview(self._ring)
+        size = len(self._ring)
+        silent_seconds = 0.0
         try:
-            # Open audio stream
-            self._stream = self._pyaudio.open(
-                format=pyaudio.paInt16,
-                channels=VOSK_CHANNELS,
-                rate=VOSK_SAMPLE_RATE,
-                input=True,
-                input_device_index=self.device_index,
-                frames_per_buffer=VOSK_CHUNK_SIZE
-            )
-            
-            logger.info(f"Audio stream opened (device: {self.device_name})")
-            
             while not self._stop_event.is_set():
-                try:
-                    # Read audio chunk
-                    audio_data = self._stream.read(
-                        VOSK_CHUNK_SIZE,
-                        exception_on_overflow=False
-                    )
-                    
-                    # Notify audio received
-                    if self.on_audio_received:
-                        self.on_audio_received()
+                if not self._data_ready.wait(timeout=0.1):
+                    continue
+                self._data_ready.clear()
+                
+                # Vosk decodes in ~200ms frames internally, so coalesce blocks
+                # into ~500ms feeds; the remainder waits in the ring
+                head = self._ring_head
+                tail = self._ring_tail
+                while head - tail >= VOSK_FEED_BYTES:
+                    # tail only advances in whole windows, so a window is
+                    # always contiguous: one copy out of the ring, handed to
+                    # Vosk as-is (no re-joining of separate blocks)
+                    start = tail % size
+                    audio_data = ring[start:start + VOSK_FEED_BYTES].tobytes()
+                    tail += VOSK_FEED_BYTES
+                    self._ring_tail = tail
                     
-                    # Feed to Vosk
-                    if self.vosk_handler:
-                        self.vosk_handler.feed_audio(audio_data)
+                    if not self.vosk_handler:
+                        continue
+                    self.vosk_handler.feed_audio(audio_data)
                     
-                except Exception as e:
-                    if not self._stop_event.is_set():
-                        logger.error(f"Error reading audio: {e}")
-                    break
+                    # Flush the utterance once the speaker has gone quiet,
+                    # so Vosk's decoding state doesn't keep growing. Each
+                    # half of the window is measured on its own, so a word at
+                    # the start of a window doesn't hide the silence after it
+                    if not AUDIOOP_AVAILABLE:
+                        continue
+                    for chunk in (audio_data[:VOSK_CHUNK_BYTES],
+                                  audio_data[VOSK_CHUNK_BYTES:]):
+                        if audioop.rms(chunk, 2) >= SILENCE_RMS_THRESHOLD:
+                            silent_seconds = 0.0
+                        else:
+                            silent_seconds += CHUNK_SECONDS
+                    if (silent_seconds >= SILENCE_FINAL_SECONDS and
+                            self.vosk_handler.get_current_partial()):
+                        self.vosk_handler.force_final()
+                        # Counted afresh, whenever the Vosk thread gets to
+                        # clearing the partial
+                        silent_seconds = 0.0
             
         except Exception as e:
-            logger.error(f"Audio capture loop error: {e}")
+            logger.error("Audio consumer loop error: %s", e)
         finally:
-            self._cleanup_stream()
+            if self._overruns:
+                logger.warning("Dropped %d audio blocks (consumer overrun)", self._overruns)
     
     def _cleanup_stream(self):
         """Clean up audio stream resources."""
@@ -231,23 +393,40 @@ class AudioHandler:
     def _handle_partial_transcription(self, text: str):
         """Handle partial (in-progress) transcription from Vosk."""
         if self.on_partial_transcription:
+            # Faster updates than this are not readable; finals still refresh
+            now = time.monotonic()
+            if now - self._last_partial_emit < PARTIAL_MIN_INTERVAL:
+                return
+            
             # Combine with buffer for full context
             buffer_text = self.get_buffer_text()
             if buffer_text:
                 full_text = f"{buffer_text} {text}"
             else:
                 full_text = text
+            
+            # Vosk re-emits the same partial while waiting for more audio
+            if full_text == self._last_partial_sent:
+                return
+            self._last_partial_emit = now
+            self._last_partial_sent = full_text
             self.on_partial_transcription(full_text)
     
     def _handle_final_transcription(self, text: str):
         """Handle final transcription from Vosk."""
         if text:
-            logger.info(f"Transcribed: {text}")
+            # Per-final log stays off the default INFO path; main.py already
+            # records the transcription at its hot-path level
+            logger.debug("Transcribed: %s", text)
             self.last_transcription_time = time.time()
             
             # Add to buffer
             with self.buffer_lock:
-                self.transcription_buffer.append(text)
+                if self._buffer_text:
+                    self._buffer_text = self._buffer_text + " " + text
+                else:
+                    self._buffer_text = text
+                self._buffer_word_count += text.count(" ") + 1
             
             # Call the user-provided callback
             if self.callback:
@@ -255,11 +434,16 @@ class AudioHandler:
             
             # Update partial display with full buffer
             if self.on_partial_transcription:
-                self.on_partial_transcription(self.get_buffer_text())
+                self._last_partial_sent = self.get_buffer_text()
+                self.on_partial_transcription(self._last_partial_sent)
     
     def stop_listening(self) -> None:
         """Stop continuous listening."""
+        # Stop the callback first so nothing is written while draining stops
+        self._cleanup_stream()
+        
         self._stop_event.set()
+        self._data_ready.set()
         
         if self._audio_thread:
             self._audio_thread.join(timeout=2.0)
@@ -267,8 +451,6 @@ class AudioHandler:
         if self.vosk_handler:
             self.vosk_handler.stop()
         
-        self._cleanup_stream()
-        
         if self._pyaudio:
             try:
                 self._pyaudio.terminate()
@@ -280,6 +462,13 @@ class AudioHandler:
         self.is_listening = False
         logger.info("Stopped listening")
     
+    def close(self) -> None:
+        """Stop listening and release the Vosk recognizer (app shutdown)."""
+        self.stop_listening()
+        if self.vosk_handler:
+            self.vosk_handler.close()
+            self.vosk_handler = None
+    
     def restart_listening(self) -> bool:
         """
         Restart the listening process.
@@ -290,18 +479,21 @@ class AudioHandler:
         logger.info("Restarting listening...")
         self.stop_listening()
         self.clear_buffer()
+        # Pick up devices plugged in since the last enumeration
+        self._device_lookup_done = False
+        _DEVICE_INDEX_BY_NAME.clear()
         time.sleep(0.3)
         return self.start_listening()
     
     def get_buffer_text(self) -> str:
-        """Get all accumulated text from the buffer."""
-        with self.buffer_lock:
-            return " ".join(self.transcription_buffer)
+        """Get all accumulated text from the buffer (lock-free read)."""
+        return self._buffer_text
     
     def clear_buffer(self) -> None:
         """Clear the transcription buffer."""
         with self.buffer_lock:
-            self.transcription_buffer.clear()
+            self._buffer_text = ""
+            self._buffer_word_count = 0
         if self.vosk_handler:
             self.vosk_handler.clear_buffer()
         logger.debug("Transcription buffer cleared")
@@ -309,14 +501,13 @@ class AudioHandler:
     def pop_buffer(self) -> str:
         """Get and clear the buffer (atomic operation)."""
         with self.buffer_lock:
-            text = " ".join(self.transcription_buffer)
-            self.transcription_buffer.clear()
+            text, self._buffer_text = self._buffer_text, ""
+            self._buffer_word_count = 0
         return text
     
     def get_buffer_word_count(self) -> int:
-        """Get the word count of buffered text."""
-        text = self.get_buffer_text()
-        return len(text.split()) if text.strip() else 0
+        """Get the word count of buffered text (maintained as finals arrive)."""
+        return self._buffer_word_count
     
     def get_device_info(self) -> dict:
         """Get information about the current audio device."""
@@ -345,17 +536,17 @@ class AudioHandler:
                 if device_idx is not None:
                     logger.info("Testing BlackHole device")
             
-            # Try to open stream briefly
+            # Opening the stream is enough: PortAudio reports device errors
+            # at open time, so no audio needs to be read
             stream = self._pyaudio.open(
                 format=pyaudio.paInt16,
                 channels=VOSK_CHANNELS,
                 rate=VOSK_SAMPLE_RATE,
                 input=True,
                 input_device_index=device_idx,
-                frames_per_buffer=VOSK_CHUNK_SIZE
+                frames_per_buffer=VOSK_CHUNK_SIZE,
+                start=False
             )
-            stream.read(VOSK_CHUNK_SIZE)
-            stream.stop_stream()
             stream.close()
             
             logger.info("Audio device test successful")
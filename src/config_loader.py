@@ -3,8 +3,48 @@ Configuration loader for Interview Copilot.
 Handles loading and validating config.json
 """
 import json
+import mmap
 import os
-from typing import Dict, Any
+import types
+from typing import Dict, Any, Mapping, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Required top-level and ollama_settings keys
+_REQUIRED_FIELDS = frozenset({
+    "my_profile",
+    "job_context",
+    "system_instruction",
+    "ollama_settings"
+})
+_OLLAMA_REQUIRED_FIELDS = frozenset({"model", "temperature", "max_tokens"})
+
+# Shared read-only default for missing sections (no dict allocated per get)
+_EMPTY = types.MappingProxyType({})
+
+# GUI defaults, overridden by gui_settings from config.json
+_GUI_DEFAULTS = types.MappingProxyType({
+    "window_width": 800,
+    "window_height": 400,
+    "font_size": 18,
+    "auto_clear_timeout": 30,
+    "position": "second_monitor",
+    "always_on_top": True
+})
+
+# Larger configs are parsed straight from a memory map (orjson only);
+# smaller ones are faster through a plain read()
+MMAP_THRESHOLD = 64 * 1024
 
 
 class ConfigLoader:
@@ -20,6 +60,10 @@ class ConfigLoader:
         self.config_path = config_path
         self.config: Dict[str, Any] = {}
         
+        # Parsed config is reused until the file's mtime changes
+        self._mtime_ns: Optional[int] = None
+        self._gui_settings: Mapping[str, Any] = _GUI_DEFAULTS
+        
     def load(self) -> Dict[str, Any]:
         """
         Load configuration from JSON file.
@@ -32,16 +76,34 @@ class ConfigLoader:
             json.JSONDecodeError: If config file is malformed
             ValueError: If required fields are missing
         """
-        if not os.path.exists(self.config_path):
+        try:
+            st = os.stat(self.config_path)
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"Configuration file not found: {self.config_path}\\n"
                 "Please create config.json from the template."
-            )
+            ) from None
+        
+        mtime_ns = st.st_mtime_ns
+        
+        # Unchanged since the last successful load
+        if mtime_ns == self._mtime_ns:
+            return self.config
         
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
+            # Read bytes: orjson parses them directly, and json.loads
+            # detects the UTF encoding itself
+            with open(self.config_path, 'rb') as f:
+                if ORJSON_AVAILABLE and st.st_size > MMAP_THRESHOLD:
+                    self.config = self._parse_mmap(f)
+                else:
+                    data = f.read()
+                    if ORJSON_AVAILABLE:
+                        self.config = orjson.loads(data)
+                    else:
+                        self.config = json.loads(data)
         except json.JSONDecodeError as e:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
             raise json.JSONDecodeError(
                 f"Invalid JSON in {self.config_path}: {e}",
                 e.doc, e.pos
@@ -50,44 +112,98 @@ class ConfigLoader:
         # Validate required fields
         self._validate()
         
+        self._mtime_ns = mtime_ns
+        # Read-only view so callers can't mutate the cached merge
+        self._gui_settings = types.MappingProxyType(
+            {**_GUI_DEFAULTS, **self.config.get("gui_settings", _EMPTY)}
+        )
         return self.config
     
-    def _validate(self) -> None:
+    def validate_only(self) -> None:
         """
-        Validate that required configuration fields exist.
+        Check config.json for required fields without building the config.
+        
+        Streams the top-level keys with ijson and stops as soon as every
+        required field has been seen, so an incomplete config fails without
+        a full parse. Content after the last required field is not checked;
+        use load() for that. Without ijson this falls back to load().
         
         Raises:
+            FileNotFoundError: If config file doesn't exist
+            json.JSONDecodeError: If config file is malformed
             ValueError: If required fields are missing
         """
-        required_fields = [
-            "my_profile",
-            "job_context",
-            "system_instruction",
-            "ollama_settings"
-        ]
-        
-        missing_fields = [
-            field for field in required_fields 
-            if field not in self.config
-        ]
+        if not IJSON_AVAILABLE:
+            self.load()
+            return
+        
+        if not os.path.exists(self.config_path):
+            raise FileNotFoundError(
+                f"Configuration file not found: {self.config_path}\\n"
+                "Please create config.json from the template."
+            )
+        
+        seen = set()
+        ollama_settings = _EMPTY
+        try:
+            with open(self.config_path, 'rb') as f:
+                for key, value in ijson.kvitems(f, ''):
+                    seen.add(key)
+                    if key == "ollama_settings":
+                        ollama_settings = value
+                    if _REQUIRED_FIELDS.issubset(seen):
+                        break
+        except ijson.JSONError as e:
+            raise json.JSONDecodeError(
+                f"Invalid JSON in {self.config_path}: {e}", "", 0
+            )
         
+        missing_fields = _REQUIRED_FIELDS.difference(seen)
         if missing_fields:
             raise ValueError(
-                f"Missing required configuration fields: {', '.join(missing_fields)}"
+                f"Missing required configuration fields: {', '.join(sorted(missing_fields))}"
             )
         
-        # Validate ollama_settings
-        ollama_required = ["model", "temperature", "max_tokens"]
-        ollama_settings = self.config.get("ollama_settings", {})
+        missing_ollama = _OLLAMA_REQUIRED_FIELDS.difference(ollama_settings)
+        if missing_ollama:
+            raise ValueError(
+                f"Missing required ollama_settings fields: {', '.join(sorted(missing_ollama))}"
+            )
+    
+    @staticmethod
+    def _parse_mmap(f) -> Dict[str, Any]:
+        """
+        Parse a large config from a read-only memory map with orjson.
+        
+        Avoids copying the file into a separate bytes object; falls back to
+        read() where the file can't be mapped.
+        """
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return orjson.loads(f.read())
         
-        missing_ollama = [
-            field for field in ollama_required
-            if field not in ollama_settings
-        ]
+        with mm, memoryview(mm) as view:
+            return orjson.loads(view)
+    
+    def _validate(self) -> None:
+        """
+        Validate that required configuration fields exist.
+        
+        Raises:
+            ValueError: If required fields are missing
+        """
+        missing_fields = _REQUIRED_FIELDS.difference(self.config)
+        if missing_fields:
+            raise ValueError(
+                f"Missing required configuration fields: {', '.join(sorted(missing_fields))}"
+            )
         
+        # Validate ollama_settings
+        missing_ollama = _OLLAMA_REQUIRED_FIELDS.difference(self.config["ollama_settings"])
         if missing_ollama:
             raise ValueError(
-                f"Missing required ollama_settings fields: {', '.join(missing_ollama)}"
+                f"Missing required ollama_settings fields: {', '.join(sorted(missing_ollama))}"
             )
     
     def get(self, key: str, default: Any = None) -> Any:
@@ -105,19 +221,8 @@ class ConfigLoader:
     
     def get_ollama_settings(self) -> Dict[str, Any]:
         """Get Ollama-specific settings."""
-        return self.config.get("ollama_settings", {})
+        return self.config.get("ollama_settings", _EMPTY)
     
-    def get_gui_settings(self) -> Dict[str, Any]:
-        """Get GUI-specific settings."""
-        defaults = {
-            "window_width": 800,
-            "window_height": 400,
-            "font_size": 18,
-            "auto_clear_timeout": 30,
-            "position": "second_monitor"
-        }
-        
-        user_settings = self.config.get("gui_settings", {})
-        defaults.update(user_settings)
-        
-        return defaults
+    def get_gui_settings(self) -> Mapping[str, Any]:
+        """Get GUI-specific settings (defaults merged at load time, read-only)."""
+        return self._gui_settings
@@ -2,20 +2,32 @@
 Gemini Client for Interview Copilot.
 Provides enhanced answers using Google's Gemini API as a fallback/enhancement to local LLM.
 """
+import asyncio
+import importlib
 import logging
 import threading
-from typing import Dict, Any, Optional, Callable, TYPE_CHECKING
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Set, Tuple
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+logger = logging.getLogger(__name__)
 
-if TYPE_CHECKING:
-    from src.session_manager import InterviewSession
+# Session annotations are plain strings ('InterviewSession' from
+# src.session_manager); nothing is imported for them at runtime.
 
-logger = logging.getLogger(__name__)
+# Instructions appended after the question on every Gemini prompt
+_PROMPT_SUFFIX = """
+
+INSTRUCTIONS:
+1. Answer the question DIRECTLY in 2-3 sentences
+2. Only reference the candidate's specific experience if it's directly relevant to the question
+3. Be natural and conversational
+4. If the question is about something not in the profile, give a thoughtful general answer
+5. Do NOT start with "Based on my background..." or similar - just answer naturally
+
+YOUR ANSWER:"""
+
+# Requests arriving within this window are sent together
+GEMINI_BATCH_WINDOW = 0.02  # seconds
 
 
 class GeminiClient:
@@ -31,13 +43,16 @@ class GeminiClient:
         self.enabled = False
         self.model_name = "gemini-2.0-flash"
         self.model = None
+        self._gen_config = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._max_batch = 2
+        self._prefix_cache: Dict[Tuple[str, str], str] = {}
+        self._genai = None
         
         gemini_settings = config.get("gemini_settings", {})
         
-        if not GEMINI_AVAILABLE:
-            logger.warning("google-generativeai not installed. Run: pip install google-generativeai")
-            return
-        
         if not gemini_settings.get("enabled", False):
             logger.info("Gemini is disabled in config")
             return
@@ -47,71 +62,143 @@ class GeminiClient:
             logger.warning("Gemini API key not configured")
             return
         
+        # Imported only when Gemini is actually used: google.generativeai
+        # pulls in grpc/protobuf and costs hundreds of ms at startup
+        try:
+            genai = importlib.import_module("google.generativeai")
+        except ImportError:
+            logger.warning("google-generativeai not installed. Run: pip install google-generativeai")
+            return
+        self._genai = genai
+        
         try:
             genai.configure(api_key=api_key)
             self.model_name = gemini_settings.get("model", "gemini-2.0-flash")
             self.model = genai.GenerativeModel(self.model_name)
+            self._gen_config = genai.GenerationConfig(
+                temperature=float(gemini_settings.get("temperature", 0.4)),
+                max_output_tokens=int(gemini_settings.get("max_output_tokens", 150)),
+            )
+            # One event loop thread drives all Gemini calls; concurrent
+            # requests share its I/O wait instead of a thread each
+            self._max_batch = int(gemini_settings.get("max_concurrency", 2))
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=self._run_loop,
+                daemon=True,
+                name="GeminiLoop"
+            ).start()
             self.enabled = True
-            logger.info(f"Gemini client initialized with model: {self.model_name}")
+            logger.info("Gemini client initialized with model: %s", self.model_name)
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini: {e}")
+            logger.error("Failed to initialize Gemini: %s", e)
     
     def is_available(self) -> bool:
         """Check if Gemini is available and configured."""
-        return self.enabled and self.model is not None
+        # enabled is only set once the model and event loop exist
+        return self.enabled
     
     def generate_answer_async(
         self,
         session: 'InterviewSession',
-        question: str,
-        callback: Callable[[str], None],
-        error_callback: Optional[Callable[[str], None]] = None
-    ) -> None:
+        question: str
+    ) -> 'Future[Optional[str]]':
         """
-        Generate answer asynchronously in background thread.
+        Generate answer asynchronously on the Gemini event loop thread.
         
         Args:
             session: Interview session with context
             question: The interview question
-            callback: Called with answer when ready
-            error_callback: Called with error message if generation fails
+            
+        Returns:
+            Future resolving to the answer (None for an empty response);
+            API errors are set as the future's exception
         """
-        if not self.is_available():
-            if error_callback:
-                error_callback("Gemini not available")
-            return
+        future: 'Future[Optional[str]]' = Future()
         
-        def _generate():
-            try:
-                answer = self._generate_answer(session, question)
-                if answer:
-                    callback(answer)
-                elif error_callback:
-                    error_callback("Empty response from Gemini")
-            except Exception as e:
-                logger.error(f"Gemini generation error: {e}")
-                if error_callback:
-                    error_callback(str(e))
+        # Disabled path: no loop hop
+        loop = self._loop
+        if not self.enabled or loop is None:
+            future.set_exception(RuntimeError("Gemini not available"))
+            return future
         
-        thread = threading.Thread(target=_generate, daemon=True)
-        thread.start()
+        # Bound method and a plain tuple; nothing is closed over per call
+        loop.call_soon_threadsafe(self._enqueue, (session, question, future))
+        return future
+    
+    def close(self) -> None:
+        """Stop accepting Gemini requests and stop the event loop thread."""
+        self.enabled = False
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+    
+    def _run_loop(self) -> None:
+        """Event loop thread: run the batching dispatcher until closed."""
+        asyncio.set_event_loop(self._loop)
+        # Created here so it binds to this loop (Python 3.8/3.9 bind
+        # asyncio.Queue to the current loop at construction)
+        self._queue = asyncio.Queue()
+        self._loop.create_task(self._dispatch())
+        self._loop.run_forever()
     
-    def _generate_answer(self, session: 'InterviewSession', question: str) -> Optional[str]:
+    def _enqueue(self, request: Tuple['InterviewSession', str, 'Future[Optional[str]]']) -> None:
+        """Queue a request; runs on the event loop thread."""
+        self._queue.put_nowait(request)
+    
+    async def _dispatch(self) -> None:
         """
-        Generate answer using Gemini API.
+        Start queued requests, at most max_concurrency in flight at once.
         
-        Args:
-            session: Interview session with context
-            question: The interview question
+        Waits GEMINI_BATCH_WINDOW after a request arrives so close-together
+        questions start together. Each request runs as its own task and frees
+        its slot when done, so a new request never waits on the slowest one
+        of an earlier batch.
+        """
+        slots = asyncio.Semaphore(self._max_batch)
+        while True:
+            request = await self._queue.get()
+            await asyncio.sleep(GEMINI_BATCH_WINDOW)
             
-        Returns:
-            Generated answer or None if error
+            while True:
+                await slots.acquire()
+                task = self._loop.create_task(self._generate(*request))
+                # Keep a reference until done; the loop only holds weak ones
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
+                if self._queue.empty():
+                    break
+                request = self._queue.get_nowait()
+    
+    async def _generate(
+        self,
+        session: 'InterviewSession',
+        question: str,
+        future: 'Future[Optional[str]]'
+    ) -> None:
+        """Run one request and resolve its future."""
+        if not future.set_running_or_notify_cancel():
+            return  # Cancelled by the caller while queued
+        try:
+            future.set_result(await self._generate_answer(session, question))
+        except Exception as e:
+            logger.error("Gemini API error: %s", e)
+            future.set_exception(e)
+    
+    def _get_prompt_prefix(self, session: 'InterviewSession') -> str:
         """
-        if not self.model:
-            return None
+        Get the static part of the prompt (background and role) for a session.
         
-        # Build a focused prompt for Gemini
-        prompt = f"""You are helping a candidate answer an interview question.
+        Keyed on the profile and job context themselves; str hashes are
+        cached, so lookups don't rescan the text.
+        """
+        key = (session.profile, session.job_context)
+        prefix = self._prefix_cache.get(key)
+        if prefix is None:
+            if len(self._prefix_cache) >= 8:
+                self._prefix_cache.clear()
+            prefix = f"""You are helping a candidate answer an interview question.
 
 CANDIDATE BACKGROUND:
 {session.profile}
@@ -120,30 +207,36 @@ TARGET ROLE:
 {session.job_context}
 
 INTERVIEW QUESTION:
-{question}
-
-INSTRUCTIONS:
-1. Answer the question DIRECTLY in 2-3 sentences
-2. Only reference the candidate's specific experience if it's directly relevant to the question
-3. Be natural and conversational
-4. If the question is about something not in the profile, give a thoughtful general answer
-5. Do NOT start with "Based on my background..." or similar - just answer naturally
-
-YOUR ANSWER:"""
-
-        try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.4,
-                    max_output_tokens=150,
-                )
-            )
+"""
+            self._prefix_cache[key] = prefix
+        return prefix
+    
+    async def _generate_answer(self, session: 'InterviewSession',
+                               question: str) -> Optional[str]:
+        """
+        Generate answer using Gemini API.
+        
+        Args:
+            session: Interview session with context
+            question: The interview question
             
-            answer = response.text.strip()
-            logger.info(f"Gemini generated answer: {answer[:100]}...")
-            return answer
+        Returns:
+            Generated answer, or None if there is no model
             
-        except Exception as e:
-            logger.error(f"Gemini API error: {e}")
+        Raises:
+            Exception: Whatever the Gemini API raised
+        """
+        if not self.model:
             return None
+        
+        # Build a focused prompt for Gemini; the background part is cached
+        prompt = self._get_prompt_prefix(session) + question + _PROMPT_SUFFIX
+
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=self._gen_config
+        )
+        
+        answer = response.text.strip()
+        logger.info("Gemini generated answer: %.100s...", answer)
+        return answer
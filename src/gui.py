@@ -3,28 +3,61 @@ GUI for Interview Copilot using Flet.
 Clean, modern UI inspired by shadcn/ui design system.
 """
 import flet as ft
+import asyncio
 import logging
 import threading
-from typing import Dict, Any, Optional, Callable, List, Tuple
-from enum import Enum
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Any, Optional, Callable, List, Set, Tuple
 from datetime import datetime
 
+from src.transcription_state import TranscriptionState
+
 logger = logging.getLogger(__name__)
 
+# Interval for applying coalesced updates on the Flet event loop (~60Hz)
+UI_TICK_INTERVAL = 1 / 60
+
+# Only the tail of the live transcription is shown, bounding the diff sent per update
+TRANSCRIPTION_DISPLAY_CHARS = 2000
 
-class TranscriptionState(Enum):
-    """State machine for transcription status."""
-    IDLE = "Idle"
-    LISTENING = "Listening..."
-    TRANSCRIBING = "Transcribing..."
-    GENERATING = "Generating Answer..."
-    READY = "Ready"
-    ERROR = "Error"
+# Shared style values (immutable once built, safe to reuse across controls)
+_RADIUS_8 = ft.RoundedRectangleBorder(radius=8)
+_PAD_24_12 = ft.padding.symmetric(horizontal=24, vertical=12)
+_PAD_20_12 = ft.padding.symmetric(horizontal=20, vertical=12)
+_PAD_16_12 = ft.padding.symmetric(horizontal=16, vertical=12)
+_ACTIVE_SESSION_BORDER = ft.border.all(1, "#3B82F6")
 
 
 class CopilotGUI:
     """Flet-based GUI for displaying interview answers with clean shadcn-style UI."""
     
+    # State indicator colors: palette keys, or literal colors outside the palette
+    _STATE_COLOR_KEYS = {
+        TranscriptionState.IDLE: "muted_foreground",
+        TranscriptionState.LISTENING: "#3B82F6",  # Blue
+        TranscriptionState.TRANSCRIBING: "warning",
+        TranscriptionState.GENERATING: "#8B5CF6",  # Purple
+        TranscriptionState.READY: "success",
+        TranscriptionState.ERROR: "destructive",
+    }
+    
+    # Pre-formatted state indicator labels
+    _STATE_LABELS = {state: f"● {state.value.upper()}" for state in TranscriptionState}
+    
+    # Start/Stop button labels
+    _START_LABEL = "▶ Start Listening"
+    _STOP_LABEL = "⏹ Stop Listening"
+    
+    # Keyboard shortcuts: lowercased key -> handler method name
+    _KEY_HANDLERS = {
+        " ": "_handle_process_now",  # Only acts while listening
+        "enter": "_handle_process_now",
+        "s": "_handle_toggle_listening",
+        "escape": "_handle_clear_buffer",
+    }
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize GUI with configuration."""
         self.config = config
@@ -35,18 +68,24 @@ class CopilotGUI:
         self.state_indicator: Optional[ft.Text] = None
         self.live_transcription: Optional[ft.TextField] = None
         self.word_count_text: Optional[ft.Text] = None
-        self.question_field: Optional[ft.TextField] = None
-        self.answer_field: Optional[ft.TextField] = None
+        self.question_field: Optional[ft.Text] = None
+        self.answer_field: Optional[ft.Text] = None
         self.process_button: Optional[ft.ElevatedButton] = None
         self.start_button: Optional[ft.ElevatedButton] = None
         self.start_button_text: Optional[ft.Text] = None
+        self._style_start: Optional[ft.ButtonStyle] = None
+        self._style_stop: Optional[ft.ButtonStyle] = None
         self.history_column: Optional[ft.Column] = None
+        self._history_section: Optional[ft.Container] = None
+        self._history_placeholder: Optional[ft.Text] = None
+        self._history_slots: List[Tuple[ft.Container, ft.Text, ft.Text]] = []
         
         # New session context components
         self.profile_input: Optional[ft.TextField] = None
         self.job_context_input: Optional[ft.TextField] = None
         self.session_status_container: Optional[ft.Container] = None
         self.session_status_text: Optional[ft.Text] = None
+        self._session_status_icon: Optional[ft.Icon] = None
         self.context_panel: Optional[ft.ExpansionPanelList] = None
         self.start_session_btn: Optional[ft.ElevatedButton] = None
         self.load_config_btn: Optional[ft.OutlinedButton] = None
@@ -55,11 +94,30 @@ class CopilotGUI:
         # Configuration
         self.width = config.get("window_width", 800)
         self.height = config.get("window_height", 700)
+        self.always_on_top = config.get("always_on_top", True)
         
         # State
         self.current_state = TranscriptionState.IDLE
         self.is_listening = False
-        self.qa_history: List[Tuple[str, str, str]] = []
+        
+        # Last state requested from any thread; lets set_state_safe drop
+        # repeats before they cross the thread boundary
+        self._state_lock = threading.Lock()
+        self._last_state_sent = self.current_state
+        self.qa_history: deque = deque(maxlen=5)  # (question line, answer line) as displayed
+        
+        # Last values shown, so repeated updates with the same value are skipped
+        self._last_status: Optional[str] = None
+        self._last_transcription = ""
+        self._last_word_count = 0
+        
+        # Word count of the last counted text; transcripts mostly grow by
+        # appending, so only the new suffix needs splitting
+        self._wc_cached_text = ""
+        self._wc_cached_count = 0
+        
+        # (epoch minute, "HH:MM") of the last formatted history timestamp
+        self._ts_cache: Tuple[int, str] = (-1, "")
         
         # Thread safety for session state
         self._session_lock = threading.Lock()
@@ -68,10 +126,30 @@ class CopilotGUI:
         self.session_start_time: Optional[str] = None
         self.session_qa_count: int = 0
         
+        # Changes waiting for the next UI tick: specific controls to update,
+        # or the whole page when the control tree itself changed
+        self._dirty_lock = threading.Lock()
+        self._dirty_controls: Set[ft.Control] = set()
+        self._dirty_page = False
+        
+        # Latest-value-wins updates waiting for the next UI tick, keyed by
+        # the updater method name; a burst of calls keeps only the newest
+        # value. Reentrant: the tick applies them while holding it, and the
+        # update methods clear what they supersede.
+        self._pending_lock = threading.RLock()
+        self._pending: Dict[str, Any] = {}
+        
+        # Streamed answer accumulated from LLM token deltas
+        self._stream_lock = threading.Lock()
+        self._streamed_answer = ""
+        
         # Enhanced answer (Gemini) state
         self.enhanced_answer_pending: Optional[str] = None
         self.enhanced_answer_banner: Optional[ft.Container] = None
         
+        # Session warning snackbar, created on first use
+        self._warn_snackbar: Optional[ft.SnackBar] = None
+        
         # Callbacks
         self.on_process_now: Optional[Callable[[], None]] = None
         self.on_restart_listening: Optional[Callable[[], None]] = None
@@ -79,6 +157,7 @@ class CopilotGUI:
         self.on_start_listening: Optional[Callable[[], None]] = None
         self.on_stop_listening: Optional[Callable[[], None]] = None
         self.on_app_ready: Optional[Callable[[], None]] = None
+        self.on_tick: Optional[Callable[[], None]] = None  # Called on every UI tick
         
         # New session callbacks
         self.on_start_session: Optional[Callable[[str, str], None]] = None  # (profile, job_context)
@@ -100,29 +179,38 @@ class CopilotGUI:
             "warning": "#F59E0B",
         }
         
+        # Palette entries used on update paths, as plain attributes
+        self._c_foreground = self.colors["foreground"]
+        self._c_success = self.colors["success"]
+        
+        # State indicator colors resolved against the palette once
+        self._state_colors = {
+            state: self.colors.get(key, key) for state, key in self._STATE_COLOR_KEYS.items()
+        }
+        
         logger.info("GUI initialized with Flet shadcn-style UI")
     
     def create_window(self) -> None:
         """Create the Flet app - called from main."""
         pass  # Flet app is created via ft.app()
     
-    def _build_ui(self, page: ft.Page):
-        """Build the complete UI."""
-        self.page = page
+    async def _build_ui(self, page: ft.Page):
+        """
+        Build the complete UI.
         
-        # Set up pubsub for thread-safe updates
-        page.pubsub.subscribe(self._handle_pubsub_message)
+        A coroutine, so Flet runs it directly on its event loop rather than
+        handing it to the session thread pool.
+        """
+        self.page = page
         
         # Page configuration
         page.title = "Interview Copilot"
         page.window.width = self.width
         page.window.height = self.height
-        page.window.always_on_top = True
+        page.window.always_on_top = self.always_on_top
         page.theme_mode = ft.ThemeMode.LIGHT
         page.padding = 24
         page.bgcolor = self.colors["background"]
-        page.fonts = {"Inter": "https://fonts.gstatic.com/s/inter/v13/UcCO3FwrK3iLTeHuS_fvQtMwCp50KnMw2boKoduKmMEVuLyfAZ9hiJ-Ek-_EeA.woff2"}
-        page.theme = ft.Theme(font_family="Inter")
         
         # Header
         header = self._build_header()
@@ -176,6 +264,9 @@ class CopilotGUI:
         # Keyboard shortcuts
         page.on_keyboard_event = self._handle_keyboard
         
+        # Start the UI tick that applies coalesced updates
+        page.run_task(self._ui_tick)
+        
         logger.info("Flet UI built successfully")
         
         # Signal that GUI is ready
@@ -191,7 +282,7 @@ class CopilotGUI:
         )
         
         self.state_indicator = ft.Text(
-            f"● {self.current_state.value.upper()}",
+            self._STATE_LABELS[self.current_state],
             size=14,
             weight=ft.FontWeight.W_600,
             color=self.colors["muted_foreground"],
@@ -217,10 +308,14 @@ class CopilotGUI:
             weight=ft.FontWeight.W_500,
         )
         
+        self._session_status_icon = ft.Icon(
+            ft.Icons.INFO_OUTLINE, size=16, color=self.colors["muted_foreground"]
+        )
+        
         self.session_status_container = ft.Container(
             content=ft.Row(
                 controls=[
-                    ft.Icon(ft.Icons.INFO_OUTLINE, size=16, color=self.colors["muted_foreground"]),
+                    self._session_status_icon,
                     self.session_status_text,
                 ],
                 spacing=8,
@@ -271,8 +366,8 @@ class CopilotGUI:
             style=ft.ButtonStyle(
                 color="#FFFFFF",
                 bgcolor=self.colors["success"],
-                shape=ft.RoundedRectangleBorder(radius=8),
-                padding=ft.padding.symmetric(horizontal=24, vertical=12),
+                shape=_RADIUS_8,
+                padding=_PAD_24_12,
             ),
         )
         
@@ -281,8 +376,8 @@ class CopilotGUI:
             icon=ft.Icons.FILE_OPEN,
             on_click=lambda _: self._handle_load_config(),
             style=ft.ButtonStyle(
-                shape=ft.RoundedRectangleBorder(radius=8),
-                padding=ft.padding.symmetric(horizontal=20, vertical=12),
+                shape=_RADIUS_8,
+                padding=_PAD_20_12,
             ),
         )
         
@@ -381,20 +476,28 @@ class CopilotGUI:
         """Build action buttons with Start/Stop toggle."""
         # Text control for dynamic button text
         self.start_button_text = ft.Text(
-            "▶ Start Listening",
+            self._START_LABEL,
             color="#FFFFFF",
             weight=ft.FontWeight.W_500,
         )
         
+        # Start/Stop styles are built once and swapped on toggle
+        self._style_start = ft.ButtonStyle(
+            bgcolor="#3B82F6",  # Blue
+            shape=_RADIUS_8,
+            padding=_PAD_24_12,
+        )
+        self._style_stop = ft.ButtonStyle(
+            bgcolor="#EF4444",  # Red
+            shape=_RADIUS_8,
+            padding=_PAD_24_12,
+        )
+        
         # Primary action: Start/Stop Listening
         self.start_button = ft.ElevatedButton(
             content=self.start_button_text,
             on_click=lambda _: self._handle_toggle_listening(),
-            style=ft.ButtonStyle(
-                bgcolor="#3B82F6",  # Blue
-                shape=ft.RoundedRectangleBorder(radius=8),
-                padding=ft.padding.symmetric(horizontal=32, vertical=14),
-            ),
+            style=self._style_start,
             width=200,
         )
         
@@ -406,8 +509,8 @@ class CopilotGUI:
             style=ft.ButtonStyle(
                 color=self.colors["primary_foreground"],
                 bgcolor=self.colors["primary"],
-                shape=ft.RoundedRectangleBorder(radius=8),
-                padding=ft.padding.symmetric(horizontal=20, vertical=12),
+                shape=_RADIUS_8,
+                padding=_PAD_20_12,
             ),
             disabled=True,  # Disabled until we have content
         )
@@ -417,8 +520,8 @@ class CopilotGUI:
             icon=ft.Icons.CLEAR,
             on_click=lambda _: self._handle_clear_buffer(),
             style=ft.ButtonStyle(
-                shape=ft.RoundedRectangleBorder(radius=8),
-                padding=ft.padding.symmetric(horizontal=16, vertical=12),
+                shape=_RADIUS_8,
+                padding=_PAD_16_12,
             ),
         )
         
@@ -434,15 +537,8 @@ class CopilotGUI:
     
     def _build_question_card(self) -> ft.Container:
         """Build the question display card."""
-        self.question_field = ft.TextField(
-            multiline=True,
-            read_only=True,
-            border_radius=8,
-            border_color=self.colors["border"],
-            bgcolor=self.colors["muted"],
-            text_style=ft.TextStyle(size=14),
-            expand=True,
-        )
+        # Display-only, so a selectable Text rather than a read-only TextField
+        self.question_field = ft.Text(size=14, selectable=True)
         
         return ft.Container(
             content=ft.Column(
@@ -453,7 +549,17 @@ class CopilotGUI:
                         weight=ft.FontWeight.W_500,
                     ),
                     ft.Container(height=8),
-                    self.question_field,
+                    ft.Container(
+                        content=ft.Column(
+                            controls=[self.question_field],
+                            scroll=ft.ScrollMode.AUTO,
+                        ),
+                        padding=12,
+                        border_radius=8,
+                        border=ft.border.all(1, self.colors["border"]),
+                        bgcolor=self.colors["muted"],
+                        expand=True,
+                    ),
                 ],
                 spacing=0,
                 expand=True,
@@ -466,15 +572,11 @@ class CopilotGUI:
     
     def _build_answer_card(self) -> ft.Container:
         """Build the answer display card."""
-        self.answer_field = ft.TextField(
-            multiline=True,
-            read_only=True,
-            border_radius=8,
-            border_color=self.colors["border"],
-            bgcolor=self.colors["background"],
-            text_style=ft.TextStyle(size=14, weight=ft.FontWeight.W_400, color=self.colors["foreground"]),
-            expand=True, # Utilize full height of container
-            content_padding=12,
+        self.answer_field = ft.Text(
+            size=14,
+            weight=ft.FontWeight.W_400,
+            color=self.colors["foreground"],
+            selectable=True,
         )
         
         return ft.Container(
@@ -493,7 +595,17 @@ class CopilotGUI:
                         spacing=6,
                     ),
                     ft.Container(height=8),
-                    self.answer_field,
+                    ft.Container(
+                        content=ft.Column(
+                            controls=[self.answer_field],
+                            scroll=ft.ScrollMode.AUTO,
+                        ),
+                        padding=12,
+                        border_radius=8,
+                        border=ft.border.all(1, self.colors["border"]),
+                        bgcolor=self.colors["background"],
+                        expand=True, # Utilize full height of container
+                    ),
                 ],
                 spacing=0,
                 expand=True,
@@ -506,48 +618,66 @@ class CopilotGUI:
         )
     
     def _build_history_section(self) -> ft.Container:
-        """Build the Q&A history section."""
+        """
+        Build an empty Q&A history section.
+        
+        Its contents are built by _build_history_content when the first
+        Q&A arrives, so sessions without answers never create them.
+        """
+        self._history_section = ft.Container(padding=ft.padding.only(top=12))
+        return self._history_section
+    
+    def _build_history_content(self) -> None:
+        """Build the history list and place it into the history section."""
+        self._history_placeholder = ft.Text(
+            "No history yet",
+            size=12,
+            color=self.colors["muted_foreground"],
+            italic=True,
+        )
+        
+        # Fixed slots for the last 3 Q&A; updates only change their text
+        # and visibility, never the column's control list
+        self._history_slots = []
+        for _ in range(3):
+            q_text = ft.Text(size=11, color=self.colors["foreground"])
+            a_text = ft.Text(size=11, color=self.colors["success"])
+            container = ft.Container(
+                content=ft.Column(controls=[q_text, a_text], spacing=2),
+                padding=8,
+                border_radius=6,
+                bgcolor=self.colors["muted"],
+                visible=False,
+            )
+            self._history_slots.append((container, q_text, a_text))
+        
         self.history_column = ft.Column(
+            controls=[self._history_placeholder] + [slot[0] for slot in self._history_slots],
+            spacing=8,
+            scroll=ft.ScrollMode.AUTO,
+        )
+        
+        self._history_section.content = ft.Column(
             controls=[
                 ft.Text(
-                    "No history yet",
+                    "Recent Q&A",
                     size=12,
+                    weight=ft.FontWeight.W_500,
                     color=self.colors["muted_foreground"],
-                    italic=True,
+                ),
+                ft.Container(
+                    content=self.history_column,
+                    height=100,
                 ),
             ],
-            spacing=8,
-            scroll=ft.ScrollMode.AUTO,
-        )
-        
-        return ft.Container(
-            content=ft.Column(
-                controls=[
-                    ft.Text(
-                        "Recent Q&A",
-                        size=12,
-                        weight=ft.FontWeight.W_500,
-                        color=self.colors["muted_foreground"],
-                    ),
-                    ft.Container(
-                        content=self.history_column,
-                        height=100,
-                    ),
-                ],
-                spacing=0,
-            ),
-            padding=ft.padding.only(top=12),
+            spacing=0,
         )
     
     def _handle_keyboard(self, e: ft.KeyboardEvent):
         """Handle keyboard shortcuts."""
-        if e.key == " " or e.key == "Enter":
-            if self.is_listening:
-                self._handle_process_now()
-        elif e.key == "S" or e.key == "s":
-            self._handle_toggle_listening()
-        elif e.key == "Escape":
-            self._handle_clear_buffer()
+        handler = self._KEY_HANDLERS.get(e.key.lower())
+        if handler:
+            getattr(self, handler)()
     
     def _handle_toggle_listening(self):
         """Handle start/stop listening toggle."""
@@ -578,37 +708,23 @@ class CopilotGUI:
             logger.warning("start_button or start_button_text is None, cannot update")
             return
         
-        logger.info(f"Updating button state: is_listening={self.is_listening}")
+        logger.info("Updating button state: is_listening=%s", self.is_listening)
         
         if self.is_listening:
-            new_text = "⏹ Stop Listening"
-            new_bgcolor = "#EF4444"  # Red
+            new_text, new_style = self._STOP_LABEL, self._style_stop
         else:
-            new_text = "▶ Start Listening"
-            new_bgcolor = "#3B82F6"  # Blue
+            new_text, new_style = self._START_LABEL, self._style_start
         
-        logger.info(f"Setting button text to: {new_text}")
+        logger.info("Setting button text to: %s", new_text)
         
-        # Update the Text control inside the button
+        # Swap in the constant label and pre-built style by reference
         self.start_button_text.value = new_text
-        
-        # Update button style
-        self.start_button.style = ft.ButtonStyle(
-            bgcolor=new_bgcolor,
-            shape=ft.RoundedRectangleBorder(radius=8),
-            padding=ft.padding.symmetric(horizontal=24, vertical=12),
-        )
+        self.start_button.style = new_style
         
         if self.process_button:
             self.process_button.disabled = not self.is_listening
         
-        # Force update
-        if self.page:
-            try:
-                self.page.update()
-                logger.info("Page updated successfully")
-            except Exception as e:
-                logger.error(f"Failed to update page: {e}")
+        self._schedule_update(self.start_button, self.process_button)
     
     def _handle_process_now(self):
         """Handle process now button."""
@@ -648,44 +764,75 @@ class CopilotGUI:
     
     def set_state(self, state: TranscriptionState) -> None:
         """Update the transcription state."""
+        with self._state_lock:
+            self._last_state_sent = state
+        self._apply_state(state)
+    
+    def _apply_state(self, state: TranscriptionState) -> None:
+        """Show a state on the indicator (the safe wrapper has already recorded it)."""
+        if state == self.current_state:
+            return
         self.current_state = state
-        
         if not self.state_indicator:
             return
-            
-        state_colors = {
-            TranscriptionState.IDLE: self.colors["muted_foreground"],
-            TranscriptionState.LISTENING: "#3B82F6",  # Blue
-            TranscriptionState.TRANSCRIBING: self.colors["warning"],
-            TranscriptionState.GENERATING: "#8B5CF6",  # Purple
-            TranscriptionState.READY: self.colors["success"],
-            TranscriptionState.ERROR: self.colors["destructive"],
-        }
-        
-        self.state_indicator.value = f"● {state.value.upper()}"
-        self.state_indicator.color = state_colors.get(state, self.colors["muted_foreground"])
-        
-        if self.page:
-            self.page.update()
+        self.state_indicator.value = self._STATE_LABELS[state]
+        self.state_indicator.color = self._state_colors[state]
+        self._schedule_update(self.state_indicator)
     
     def update_status(self, status: str) -> None:
         """Update status text."""
-        if self.status_text:
+        # Direct updates win over any older status still waiting for the tick
+        with self._pending_lock:
+            self._pending.pop("update_status", None)
+        
+        if self.status_text and status != self._last_status:
+            self._last_status = status
             self.status_text.value = f"Status: {status}"
-            if self.page:
-                self.page.update()
+            self._schedule_update(self.status_text)
     
     def update_live_transcription(self, text: str) -> None:
         """Update live transcription display."""
-        if self.live_transcription and self.page:
-            self.live_transcription.value = text
+        # Direct updates win over any older text still waiting for the tick
+        with self._pending_lock:
+            self._pending.pop("update_live_transcription", None)
+        
+        if self.live_transcription and text != self._last_transcription:
+            self._last_transcription = text
+            if len(text) > TRANSCRIPTION_DISPLAY_CHARS:
+                self.live_transcription.value = "…" + text[-TRANSCRIPTION_DISPLAY_CHARS:]
+            else:
+                self.live_transcription.value = text
             
             # Update word count
-            word_count = len(text.split()) if text.strip() else 0
-            if self.word_count_text:
+            word_count = self._count_words(text)
+            if self.word_count_text and word_count != self._last_word_count:
+                self._last_word_count = word_count
                 self.word_count_text.value = f"{word_count} word{'s' if word_count != 1 else ''}"
             
-            self.page.update()
+            self._schedule_update(self.live_transcription, self.word_count_text)
+    
+    def _count_words(self, text: str) -> int:
+        """Count words in text, splitting only what was appended since the last call."""
+        cached = self._wc_cached_text
+        if cached and text.startswith(cached):
+            delta = text[len(cached):]
+            count = self._wc_cached_count + len(delta.split())
+            # A word continuing across the old end was already counted once
+            if delta and not cached[-1].isspace() and not delta[0].isspace():
+                count -= 1
+        else:
+            count = len(text.split())
+        
+        self._wc_cached_text = text
+        self._wc_cached_count = count
+        return count
+    
+    def _format_timestamp(self) -> str:
+        """Current time as HH:MM, formatted at most once per minute."""
+        minute = int(time.time()) // 60
+        if minute != self._ts_cache[0]:
+            self._ts_cache = (minute, datetime.now().strftime("%H:%M"))
+        return self._ts_cache[1]
     
     def _increment_session_qa_count(self) -> int:
         """
@@ -700,21 +847,19 @@ class CopilotGUI:
                 return self.session_qa_count
             return 0
     
-    def _update_qa_display(self, question: str, answer: str) -> None:
-        """
-        Shared logic for updating Q&A display.
-        Extracted to avoid code duplication between display_question_answer
-        and _do_display_question_answer.
-        """
+    def display_question_answer(self, question: str, answer: str) -> None:
+        """Display question and answer."""
+        self._drop_pending_answer_stream()
         if self.question_field:
             self.question_field.value = question
         if self.answer_field:
             self.answer_field.value = answer
         
-        timestamp = datetime.now().strftime("%H:%M")
-        self.qa_history.append((timestamp, question, answer))
-        if len(self.qa_history) > 5:
-            self.qa_history = self.qa_history[-5:]
+        timestamp = self._format_timestamp()
+        # Truncated and formatted once here rather than on every history render
+        q_short = question[:50] + "..." if len(question) > 50 else question
+        a_short = answer[:70] + "..." if len(answer) > 70 else answer
+        self.qa_history.append((f"[{timestamp}] Q: {q_short}", f"A: {a_short}"))
         
         # Thread-safe session Q&A count increment
         qa_count = self._increment_session_qa_count()
@@ -728,44 +873,26 @@ class CopilotGUI:
         self._update_history_display()
         self.update_live_transcription("")
         self.set_state(TranscriptionState.READY)
-    
-    def display_question_answer(self, question: str, answer: str) -> None:
-        """Display question and answer (main thread call)."""
-        self._update_qa_display(question, answer)
-        if self.page:
-            self.page.update()
+        self._schedule_update()
         logger.info("Display updated with new Q&A")
     
     def _update_history_display(self):
         """Update history display."""
         if not self.history_column:
-            return
-        
-        self.history_column.controls.clear()
-        
-        if not self.qa_history:
-            self.history_column.controls.append(
-                ft.Text("No history yet", size=12, color=self.colors["muted_foreground"], italic=True)
-            )
-        else:
-            for timestamp, question, answer in self.qa_history[-3:]:
-                q_short = question[:50] + "..." if len(question) > 50 else question
-                a_short = answer[:70] + "..." if len(answer) > 70 else answer
-                
-                self.history_column.controls.append(
-                    ft.Container(
-                        content=ft.Column(
-                            controls=[
-                                ft.Text(f"[{timestamp}] Q: {q_short}", size=11, color=self.colors["foreground"]),
-                                ft.Text(f"A: {a_short}", size=11, color=self.colors["success"]),
-                            ],
-                            spacing=2,
-                        ),
-                        padding=8,
-                        border_radius=6,
-                        bgcolor=self.colors["muted"],
-                    )
-                )
+            if not self._history_section or not self.qa_history:
+                return
+            self._build_history_content()
+        
+        # Last 3 entries without copying the whole deque
+        recent = list(islice(self.qa_history, max(0, len(self.qa_history) - 3), None))
+        self._history_placeholder.visible = not recent
+        
+        for i, (container, q_text, a_text) in enumerate(self._history_slots):
+            if i < len(recent):
+                q_text.value, a_text.value = recent[i]
+                container.visible = True
+            else:
+                container.visible = False
     
     def clear_display(self) -> None:
         """Clear displays."""
@@ -774,16 +901,15 @@ class CopilotGUI:
         if self.answer_field:
             self.answer_field.value = ""
         self.set_state(TranscriptionState.LISTENING)
-        if self.page:
-            self.page.update()
+        self._schedule_update(self.question_field, self.answer_field)
     
     def show_error(self, message: str) -> None:
         """Display error message."""
+        self._drop_pending_answer_stream()
         self.set_state(TranscriptionState.ERROR)
         if self.answer_field:
             self.answer_field.value = f"Error: {message}"
-        if self.page:
-            self.page.update()
+        self._schedule_update(self.answer_field)
     
     def update_timestamp(self) -> None:
         """Update timestamp (compatibility method)."""
@@ -796,8 +922,7 @@ class CopilotGUI:
         if self.job_context_input:
             self.job_context_input.value = job_context
         
-        if self.page:
-            self.page.update()
+        self._schedule_update(self.profile_input, self.job_context_input)
         
         logger.info("Context fields populated")
     
@@ -817,40 +942,42 @@ class CopilotGUI:
         status_text = f"Session: {session_id} | Started: {start_time} | {qa_count} Q&A"
         
         self.session_status_text.value = status_text
-        self.session_status_text.color = self.colors["foreground"]
+        self.session_status_text.color = self._c_foreground
         
         # Update container style to show active state
         self.session_status_container.bgcolor = "#DBEAFE"  # Light blue
-        self.session_status_container.border = ft.border.all(1, "#3B82F6")
+        self.session_status_container.border = _ACTIVE_SESSION_BORDER
         
         # Update icon
-        if self.session_status_container.content and hasattr(self.session_status_container.content, 'controls'):
-            icon = self.session_status_container.content.controls[0]
-            icon.name = ft.Icons.CHECK_CIRCLE
-            icon.color = self.colors["success"]
+        self._session_status_icon.name = ft.Icons.CHECK_CIRCLE
+        self._session_status_icon.color = self._c_success
         
-        if self.page:
-            self.page.update()
+        self._schedule_update(self.session_status_container)
         
-        logger.info(f"Session status updated: {status_text}")
+        logger.info("Session status updated: %s", status_text)
     
     def show_no_session_warning(self) -> None:
         """Show snackbar/banner warning user to start a session."""
         if not self.page:
             return
         
-        snackbar = ft.SnackBar(
-            content=ft.Text(
-                "Please enter profile or job context before starting a session",
-                color="#FFFFFF",
-            ),
-            bgcolor=self.colors["warning"],
-            duration=3000,
-        )
-        
-        self.page.overlay.append(snackbar)
-        snackbar.open = True
-        self.page.update()
+        # One snackbar is created on first use and reopened afterwards, so
+        # repeated warnings don't grow page.overlay
+        if self._warn_snackbar is None:
+            self._warn_snackbar = ft.SnackBar(
+                content=ft.Text(
+                    "Please enter profile or job context before starting a session",
+                    color="#FFFFFF",
+                ),
+                bgcolor=self.colors["warning"],
+                duration=3000,
+                open=True,
+            )
+            self.page.overlay.append(self._warn_snackbar)
+            self._schedule_update()
+        else:
+            self._warn_snackbar.open = True
+            self._schedule_update(self._warn_snackbar)
         
         logger.warning("Session start attempted with empty context")
     
@@ -865,115 +992,134 @@ class CopilotGUI:
         if self.context_panel.controls and len(self.context_panel.controls) > 0:
             self.context_panel.controls[0].expanded = False
         
-        self.page.update()
+        self._schedule_update(self.context_panel)
         logger.info("Context panel collapsed")
     
-    def _handle_pubsub_message(self, message):
-        """Handle pubsub messages for thread-safe UI updates."""
-        if not isinstance(message, dict):
-            return
-        
-        msg_type = message.get("type")
-        
-        if msg_type == "live_transcription":
-            self._do_update_live_transcription(message.get("text", ""))
-        elif msg_type == "state":
-            self._do_set_state(message.get("state"))
-        elif msg_type == "status":
-            self._do_update_status(message.get("status", ""))
-        elif msg_type == "question_answer":
-            self._do_display_question_answer(
-                message.get("question", ""),
-                message.get("answer", "")
-            )
-        elif msg_type == "error":
-            self._do_show_error(message.get("message", ""))
-        elif msg_type == "enhanced_answer_ready":
-            self._do_show_enhanced_answer_banner(message.get("answer", ""))
+    def _drop_pending_answer_stream(self) -> None:
+        """Discard streamed-answer updates superseded by a final answer or error."""
+        with self._pending_lock:
+            self._pending.pop("_do_start_answer_stream", None)
+            self._pending.pop("_do_update_answer_stream", None)
     
-    def _do_update_live_transcription(self, text: str) -> None:
-        """Internal method to update live transcription (called on main thread)."""
-        if self.live_transcription:
-            self.live_transcription.value = text
-            word_count = len(text.split()) if text.strip() else 0
-            if self.word_count_text:
-                self.word_count_text.value = f"{word_count} word{'s' if word_count != 1 else ''}"
-        if self.page:
-            self.page.update()
+    def _do_start_answer_stream(self, question: str) -> None:
+        """Internal method to prepare Q&A fields for a streamed answer (applied by the UI tick)."""
+        if self.question_field:
+            self.question_field.value = question
+        if self.answer_field:
+            self.answer_field.value = ""
+        self._schedule_update(self.question_field, self.answer_field)
     
-    def _do_set_state(self, state: TranscriptionState) -> None:
-        """Internal method to set state (called on main thread)."""
-        self.current_state = state
-        if not self.state_indicator:
-            return
-        state_colors = {
-            TranscriptionState.IDLE: self.colors["muted_foreground"],
-            TranscriptionState.LISTENING: "#3B82F6",
-            TranscriptionState.TRANSCRIBING: self.colors["warning"],
-            TranscriptionState.GENERATING: "#8B5CF6",
-            TranscriptionState.READY: self.colors["success"],
-            TranscriptionState.ERROR: self.colors["destructive"],
-        }
-        self.state_indicator.value = f"● {state.value.upper()}"
-        self.state_indicator.color = state_colors.get(state, self.colors["muted_foreground"])
-        if self.page:
-            self.page.update()
+    def _do_update_answer_stream(self, answer: str) -> None:
+        """Internal method to show the answer streamed so far (applied by the UI tick)."""
+        if self.answer_field:
+            self.answer_field.value = answer
+        self._schedule_update(self.answer_field)
     
-    def _do_update_status(self, status: str) -> None:
-        """Internal method to update status (called on main thread)."""
-        if self.status_text:
-            self.status_text.value = f"Status: {status}"
-        if self.page:
-            self.page.update()
+    # Thread-safe wrapper methods; updates are queued for the UI tick or
+    # handed to the page with run_thread
+    def update_live_transcription_safe(self, text: str) -> None:
+        """
+        Thread-safe live transcription update.
+        
+        Only the latest text is kept; it is applied on the next UI tick, so
+        bursts of partial results cost a single update per frame.
+        """
+        self._set_pending("update_live_transcription", text)
     
-    def _do_display_question_answer(self, question: str, answer: str) -> None:
-        """Internal method to display Q&A (called via pubsub on main thread)."""
-        self._update_qa_display(question, answer)
-        if self.page:
-            self.page.update()
-        logger.info("Display updated with new Q&A")
+    def _set_pending(self, updater: str, value: Any) -> None:
+        """Queue the latest value for an updater; the next UI tick applies it."""
+        with self._pending_lock:
+            self._pending[updater] = value
     
-    def _do_show_error(self, message: str) -> None:
-        """Internal method to show error (called on main thread)."""
-        self._do_set_state(TranscriptionState.ERROR)
-        if self.answer_field:
-            self.answer_field.value = f"Error: {message}"
-        if self.page:
-            self.page.update()
+    def _schedule_update(self, *controls: Optional[ft.Control]) -> None:
+        """
+        Mark controls (or, with no arguments, the whole page) dirty.
+        
+        The next UI tick sends a single update for everything marked, so
+        any number of changes within one tick (~16ms) are shipped to
+        Flutter as one diff. Passing the changed controls limits that diff
+        to their subtrees instead of walking the entire page.
+        """
+        with self._dirty_lock:
+            if controls:
+                self._dirty_controls.update(c for c in controls if c is not None)
+            else:
+                self._dirty_page = True
     
-    # Thread-safe wrapper methods that use pubsub
-    def update_live_transcription_safe(self, text: str) -> None:
-        """Thread-safe live transcription update."""
-        if self.page:
-            self.page.pubsub.send_all({"type": "live_transcription", "text": text})
+    async def _ui_tick(self) -> None:
+        """Apply coalesced updates on the Flet event loop at a fixed rate."""
+        while True:
+            await asyncio.sleep(UI_TICK_INTERVAL)
+            
+            try:
+                # Applied under the lock so a newer value queued meanwhile
+                # is not cleared by the update methods
+                with self._pending_lock:
+                    pending, self._pending = self._pending, {}
+                    for updater, value in pending.items():
+                        getattr(self, updater)(value)
+                if self.on_tick:
+                    self.on_tick()
+                # Taken first: changes made during the update re-mark them
+                with self._dirty_lock:
+                    controls, self._dirty_controls = self._dirty_controls, set()
+                    full, self._dirty_page = self._dirty_page, False
+                if self.page:
+                    if full:
+                        self.page.update()
+                    elif controls:
+                        self.page.update(*controls)
+            except Exception as e:
+                logger.error("Error in UI tick: %s", e)
     
     def set_state_safe(self, state: TranscriptionState) -> None:
-        """Thread-safe state update."""
+        """Thread-safe state update; repeats of the last requested state are dropped."""
+        with self._state_lock:
+            if state == self._last_state_sent:
+                return
+            self._last_state_sent = state
         if self.page:
-            self.page.pubsub.send_all({"type": "state", "state": state})
+            self.page.run_thread(self._apply_state, state)
     
     def update_status_safe(self, status: str) -> None:
-        """Thread-safe status update."""
-        if self.page:
-            self.page.pubsub.send_all({"type": "status", "status": status})
+        """Thread-safe status update; like live transcription, only the latest is applied."""
+        self._set_pending("update_status", status)
     
     def display_question_answer_safe(self, question: str, answer: str) -> None:
         """Thread-safe Q&A display."""
         if self.page:
-            self.page.pubsub.send_all({"type": "question_answer", "question": question, "answer": answer})
+            self.page.run_thread(self.display_question_answer, question, answer)
+    
+    def start_answer_stream_safe(self, question: str) -> None:
+        """Thread-safe reset of the Q&A display before streaming an answer."""
+        with self._stream_lock:
+            self._streamed_answer = ""
+        self._set_pending("_do_start_answer_stream", question)
+    
+    def append_answer_token_safe(self, token: str) -> None:
+        """
+        Thread-safe append of a streamed answer token.
+        
+        Queues the accumulated answer rather than the delta, so tokens
+        arriving faster than the UI tick collapse into one update.
+        """
+        with self._stream_lock:
+            self._streamed_answer += token
+            answer = self._streamed_answer
+        self._set_pending("_do_update_answer_stream", answer)
     
     def show_error_safe(self, message: str) -> None:
         """Thread-safe error display."""
         if self.page:
-            self.page.pubsub.send_all({"type": "error", "message": message})
+            self.page.run_thread(self.show_error, message)
     
     def show_enhanced_answer_ready_safe(self, answer: str) -> None:
         """Thread-safe notification that enhanced Gemini answer is ready."""
         if self.page:
-            self.page.pubsub.send_all({"type": "enhanced_answer_ready", "answer": answer})
+            self.page.run_thread(self._do_show_enhanced_answer_banner, answer)
     
     def _do_show_enhanced_answer_banner(self, answer: str) -> None:
-        """Show the enhanced answer notification banner (called on main thread)."""
+        """Show the enhanced answer notification banner (runs on a Flet worker thread via page.run_thread)."""
         if not self.page:
             return
         
@@ -1029,7 +1175,7 @@ class CopilotGUI:
         
         # Add banner to the page overlay
         self.page.overlay.append(self.enhanced_answer_banner)
-        self.page.update()
+        self._schedule_update()
         
         logger.info("Enhanced answer banner shown")
     
@@ -1039,9 +1185,9 @@ class CopilotGUI:
             if self.enhanced_answer_banner in self.page.overlay:
                 self.page.overlay.remove(self.enhanced_answer_banner)
             self.enhanced_answer_banner = None
-            self.page.update()
+            self._schedule_update()
     
     def run(self) -> None:
         """Start the Flet app."""
         logger.info("Starting Flet GUI")
-        ft.app(target=self._build_ui)
+        asyncio.run(ft.app_async(target=self._build_ui))
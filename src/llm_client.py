@@ -2,21 +2,61 @@
 LLM Client for Interview Copilot.
 Handles communication with local Ollama API.
 """
+import httpx
 import ollama
 import logging
+import os
 import re
-from typing import Dict, Any, Optional, TYPE_CHECKING
-import re
+import threading
+import time
+from typing import Dict, Any, Optional, AsyncIterator, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from src.session_manager import InterviewSession
 
 logger = logging.getLogger(__name__)
 
+# Quantization tags accepted in ollama_settings.model_quantization.
+# Q4_K_M streams about half the bytes per token of Q8_0 (faster decode on
+# memory-bound CPU/Apple Silicon); Q8_0 is closer to full precision.
+MODEL_QUANTIZATIONS = ("q4_0", "q4_K_M", "q5_K_M", "q8_0", "fp16")
+
+# Keep idle connections to Ollama open between questions; httpx's default
+# keep-alive expiry (5s) is shorter than a typical gap between questions
+OLLAMA_CONNECTION_LIMITS = httpx.Limits(
+    max_connections=4,
+    max_keepalive_connections=4,
+    keepalive_expiry=60.0
+)
+
+# Seconds a successful model check is trusted; the installed models only
+# change when someone runs `ollama pull`/`ollama rm`
+MODEL_CHECK_TTL = 60.0
+
+# Seconds shutdown waits for Ollama to unload the model; an unreachable
+# server must not hold up exit
+UNLOAD_TIMEOUT = 2.0
+
+# Rough prompt size estimate for English text, used before Ollama tokenizes
+CHARS_PER_TOKEN = 4
+
 # Constants for validation
 MAX_QUESTION_LENGTH = 500  # Maximum characters for question
 MIN_QUESTION_WORDS = 4  # Minimum words to consider as question
 
+# str.translate table deleting C0/C1 control characters
+_CTRL_CHARS_TABLE = dict.fromkeys([*range(0x00, 0x20), *range(0x7f, 0xa0)])
+
+# Question markers, built once into one regex. Plain substring matching, as
+# before: "explained", "described" and "whatever" still count
+_QUESTION_RE = re.compile(
+    r"what|when|where|who|why|how"
+    r"|can you|could you|would you|will you"
+    r"|do you|did you|have you|are you|is there"
+    r"|tell me|explain|describe|walk me through"
+    r"|experience with|worked on|your background"
+)
+
 
 class LLMClient:
     """Client for interfacing with Ollama API."""
@@ -28,17 +68,80 @@ class LLMClient:
         Args:
             config: Configuration dictionary from config_loader
         """
-        self.my_profile = config.get("my_profile", "")
-        self.job_context = config.get("job_context", "")
-        self.system_instruction = config.get("system_instruction", "")
-        
         ollama_settings = config.get("ollama_settings", {})
-        self.model = ollama_settings.get("model", "llama3.2:3b")
+        self.model = self._apply_quantization(
+            ollama_settings.get("model", "llama3.2:3b"),
+            ollama_settings.get("model_quantization", "")
+        )
         self.temperature = ollama_settings.get("temperature", 0.3)
         self.max_tokens = ollama_settings.get("max_tokens", 120)
         self.num_ctx = ollama_settings.get("num_ctx", 2048)
+        self.num_batch = ollama_settings.get("num_batch", 512)
+        
+        # Built once; num_predict/num_ctx bound decode length and prefill cost
+        self._options = {
+            "temperature": self.temperature,
+            "num_predict": self.max_tokens,
+            "num_ctx": self.num_ctx,
+            "num_batch": self.num_batch
+        }
+        # -1 keeps the model resident for the whole interview (no cold starts)
+        self.keep_alive = ollama_settings.get("keep_alive", -1)
+        
+        # Persistent clients keep the HTTP connection to Ollama open between
+        # requests; host=None falls back to OLLAMA_HOST / localhost:11434
+        host = ollama_settings.get("host")
+        self._client = ollama.Client(host=host, limits=OLLAMA_CONNECTION_LIMITS)
+        self._async_client = ollama.AsyncClient(host=host, limits=OLLAMA_CONNECTION_LIMITS)
+        
+        # Monotonic time of the last successful test_connection, if any
+        self._model_verified_at: Optional[float] = None
         
         logger.info(f"Initialized LLM client with model: {self.model}")
+        self._log_memory()
+    
+    @staticmethod
+    def _apply_quantization(model: str, quantization: str) -> str:
+        """
+        Select the quantized tag of a model.
+        
+        "llama3.1:8b" with "q4_K_M" becomes "llama3.1:8b-instruct-q4_K_M".
+        Models that already name a quantization are returned unchanged.
+        
+        Args:
+            model: Model name from config
+            quantization: One of MODEL_QUANTIZATIONS, or empty for the default tag
+            
+        Returns:
+            Model name to request from Ollama
+        """
+        if not quantization:
+            return model
+        if quantization not in MODEL_QUANTIZATIONS:
+            logger.warning(
+                f"Unknown model_quantization '{quantization}', "
+                f"expected one of {MODEL_QUANTIZATIONS}"
+            )
+            return model
+        
+        name, _, tag = model.partition(":")
+        if not tag:
+            logger.warning(f"model_quantization needs a size tag (e.g. {name}:8b)")
+            return model
+        if any(q.lower() in tag.lower() for q in MODEL_QUANTIZATIONS):
+            return model
+        
+        if "instruct" not in tag:
+            tag = f"{tag}-instruct"
+        return f"{name}:{tag}-{quantization}"
+    
+    def _log_memory(self) -> None:
+        """Log system RAM to help pick a model size and quantization."""
+        try:
+            total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (AttributeError, ValueError, OSError):
+            return  # Not available on this platform (e.g. Windows)
+        logger.info(f"System RAM: {total / 1024 ** 3:.1f} GB")
     
     def _validate_and_sanitize_question(self, question: str) -> Optional[str]:
         """
@@ -64,7 +167,7 @@ class LLMClient:
             question = question[:MAX_QUESTION_LENGTH]
         
         # Sanitize - remove control characters
-        question = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', question)
+        question = question.translate(_CTRL_CHARS_TABLE)
         
         # Check minimum length after sanitization
         if len(question) < 5:
@@ -95,28 +198,9 @@ class LLMClient:
             logger.debug(f"Question too short ({len(words)} words): '{text}'")
             return False
         
-        # Question markers
-        question_words = [
-            'what', 'when', 'where', 'who', 'why', 'how',
-            'can you', 'could you', 'would you', 'will you',
-            'do you', 'did you', 'have you', 'are you', 'is there',
-            'tell me', 'explain', 'describe', 'walk me through',
-            'experience with', 'worked on', 'your background'
-        ]
-        
-        # Common interview preambles to ignore
-        preambles = ['great', 'okay', 'alright', 'so', 'now', 'well', 'thanks', 'thank you']
-        
-        # Remove preambles
-        if words and words[0] in preambles:
-            text = ' '.join(words[1:])
-        
-        # Check if starts with question word (after removing preamble)
-        if any(text.startswith(word) for word in question_words):
-            return True
-        
-        # Check if question words appear anywhere in text
-        if any(word in text for word in question_words):
+        # Check if question markers appear anywhere in text (one regex pass);
+        # this also covers texts that start with one, preamble or not
+        if _QUESTION_RE.search(text):
             return True
         
         # Check if ends with question mark
@@ -125,141 +209,165 @@ class LLMClient:
         
         return False
     
-    def generate_answer_with_session(self, session: 'InterviewSession', 
-                                      question: str) -> Optional[str]:
+    async def stream_answer_with_session(self, session: 'InterviewSession',
+                                         question: str) -> AsyncIterator[str]:
         """
-        Generate answer using pre-built session context (ZERO re-processing).
+        Stream an answer token-by-token using pre-built session context.
         
-        This method uses the session's cached prompts and conversation history,
-        eliminating the overhead of rebuilding context on every question.
+        Validates the question, then yields content deltas as Ollama produces
+        them so the UI can show the first tokens instead of waiting for the
+        full response. The KV context returned by
+        Ollama is cached on the session and already holds the profile and
+        previous exchanges, so follow-up questions only prefill the new
+        question; without a usable context the prompt is rebuilt from the
+        profile and the recent history.
         
         Args:
             session: Active interview session with pre-built prompts
             question: The interview question
             
-        Returns:
-            Generated answer or None if error/not a question
+        Yields:
+            Answer content deltas (nothing if not a question)
+            
+        Raises:
+            Exception: Ollama request or stream errors, after logging; they
+                are never yielded as answer text
         """
         # Validate and sanitize input
         question = self._validate_and_sanitize_question(question)
         if not question:
             logger.debug("Question validation failed")
-            return None
+            return
         
         # Check if it's a question
         if not self.is_question(question):
             logger.debug(f"Not identified as question: {question}")
-            return None
+            return
         
+        parts = []
+        context = None
         try:
-            # Use session's pre-built messages (NO re-processing)
-            messages = session.build_messages(question)
+            # Reuse the KV context from the previous turn when it was produced
+            # by the same model and still leaves room for the new prompt and
+            # a full answer
+            cached = session.ollama_context
+            if cached and session.ollama_model != self.model:
+                cached = None
+            prompt = session.build_prompt(question)
+            if cached and (len(cached) + len(prompt) // CHARS_PER_TOKEN +
+                           self.max_tokens >= self.num_ctx):
+                cached = None
+            if session.ollama_context and not cached:
+                logger.debug("Discarding cached Ollama context")
+                session.ollama_context = None
+                prompt = session.build_prompt(question)  # Now with history
+            if cached:
+                prompt_args = {"context": cached}
+            else:
+                prompt_args = {"system": session.system_instruction}
             
-            logger.info(f"Generating answer for: {question[:50]}...")
+            logger.info(f"Streaming answer for: {question[:50]}...")
             
-            response = ollama.chat(
+            stream = await self._async_client.generate(
                 model=self.model,
-                messages=messages,
-                stream=False,
-                options={
-                    "temperature": self.temperature,
-                    "num_predict": self.max_tokens,
-                    "num_ctx": self.num_ctx
-                }
+                prompt=prompt,
+                stream=True,
+                keep_alive=self.keep_alive,
+                options=self._options,
+                **prompt_args
             )
             
-            # Validate response structure
-            try:
-                answer = response.get('message', {}).get('content', '').strip()
-                if not answer:
-                    raise ValueError("Empty response from LLM")
-            except (KeyError, AttributeError, TypeError) as e:
-                logger.error(f"Unexpected response structure: {e}")
-                logger.debug(f"Response: {response}")
-                return "Error: Received invalid response from LLM"
+            async for chunk in stream:
+                token = chunk['response']
+                if token:
+                    parts.append(token)
+                    yield token
+                if chunk.get('done'):
+                    context = chunk.get('context')
+                    self._log_throughput(chunk)
             
+        except Exception as e:
+            logger.error(f"Error streaming answer: {e}")
+            raise
+        
+        if context:
+            session.ollama_context = list(context)
+            session.ollama_model = self.model
+        
+        answer = "".join(parts).strip()
+        if answer:
             # Record in session history for conversation continuity
             session.add_exchange(question, answer)
-            
-            logger.info(f"Generated answer: {answer[:100]}...")
-            return answer
-            
-        except Exception as e:
-            logger.error(f"Error generating answer: {e}")
-            return f"Error: Unable to generate answer ({str(e)})"
+            logger.info(f"Streamed answer: {answer[:100]}...")
     
-    def generate_answer(self, question: str) -> Optional[str]:
+    def _log_throughput(self, response: Any) -> None:
         """
-        Generate answer to interview question using Ollama.
+        Log decode speed from the timing fields of a final Ollama response.
         
         Args:
-            question: The interview question transcribed from audio
-            
-        Returns:
-            Generated answer or None if error/not a question
+            response: Last chunk of a generate stream
         """
-        # Skip if not a question
-        if not self.is_question(question):
-            logger.debug(f"Not identified as question: {question}")
-            return None
+        eval_count = response.get('eval_count') or 0
+        eval_duration = response.get('eval_duration') or 0
+        if eval_count and eval_duration:
+            logger.info(
+                f"Decoded {eval_count} tokens at "
+                f"{eval_count / eval_duration * 1e9:.1f} tokens/sec"
+            )
+    
+    def warmup(self) -> bool:
+        """
+        Load the model into memory ahead of the first question.
         
+        Issues a 1-token generation so Ollama loads the weights and allocates
+        the KV cache, and pins the model with keep_alive so it stays resident.
+        
+        Returns:
+            True if the model was loaded successfully
+        """
         try:
-            # Build the prompt
-            prompt = self._build_prompt(question)
-            
-            # Call Ollama API with streaming
-            logger.info(f"Generating answer for: {question[:50]}...")
-            
-            response = ollama.chat(
+            self._client.generate(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_instruction},
-                    {"role": "user", "content": prompt}
-                ],
-                stream=False,
-                options={
-                    "temperature": self.temperature,
-                    "num_predict": self.max_tokens,
-                    "num_ctx": self.num_ctx
-                }
+                prompt=" ",
+                keep_alive=self.keep_alive,
+                # Same num_ctx/num_batch as real requests so Ollama does not
+                # reload the model with a different KV cache size later
+                options={**self._options, "num_predict": 1}
             )
-            
-            answer = response['message']['content'].strip()
-            logger.info(f"Generated answer: {answer[:100]}...")
-            
-            return answer
+            logger.info(f"Model {self.model} warmed up and pinned in memory")
+            return True
             
         except Exception as e:
-            logger.error(f"Error generating answer: {e}")
-            return f"Error: Unable to generate answer ({str(e)})"
+            logger.warning(f"Model warm-up failed: {e}")
+            return False
     
-    def _build_prompt(self, question: str) -> str:
+    def close(self) -> None:
         """
-        Build optimized prompt for Ollama.
+        Unload the model from Ollama and close the sync HTTP connections.
         
-        Args:
-            question: The interview question
-            
-        Returns:
-            Formatted prompt string
+        With keep_alive=-1 Ollama would hold the model in RAM/VRAM after the
+        copilot exits. Best effort: the unload gets UNLOAD_TIMEOUT seconds.
         """
-        prompt = f"""Context about the candidate:
-{self.my_profile}
-
-Job context:
-{self.job_context}
-
-Question from interviewer: {question}
-
-Provide a concise 2-3 sentence answer that:
-- Directly addresses the question
-- References specific experience from the profile
-- Sounds natural and conversational
-- Stays under 100 words
-
-Answer:"""
-        
-        return prompt
+        unload = threading.Thread(target=self._unload, daemon=True, name="OllamaUnload")
+        unload.start()
+        unload.join(UNLOAD_TIMEOUT)
+        if unload.is_alive():
+            logger.warning(f"Ollama did not unload {self.model} in time")
+            return  # Still using the connection pool
+        # ollama 0.1.x clients have no close(); the httpx client is _client
+        self._client._client.close()
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP connections (run on the streaming loop)."""
+        await self._async_client._client.aclose()
+    
+    def _unload(self) -> None:
+        """Ask Ollama to drop the model now (an empty prompt with keep_alive=0)."""
+        try:
+            self._client.generate(model=self.model, prompt="", keep_alive=0)
+            logger.info(f"Model {self.model} unloaded")
+        except Exception as e:
+            logger.warning(f"Model unload failed: {e}")
     
     def test_connection(self) -> bool:
         """
@@ -268,28 +376,31 @@ Answer:"""
         Returns:
             True if connection successful and model available
         """
+        # A recent positive check is reused; failures always re-query
+        if (self._model_verified_at is not None and
+                time.monotonic() - self._model_verified_at < MODEL_CHECK_TTL):
+            return True
+        
         try:
             # List available models
-            response = ollama.list()
+            response = self._client.list()
             
-            # Handle new API (objects) and old API (dicts)
-            model_names = []
-            if hasattr(response, 'models'):
-                # New API: ListResponse object with models attribute
-                model_names = [m.model for m in response.models]
-            elif isinstance(response, dict):
-                # Old API: dictionary
-                model_names = [m.get('name') or m.get('model') for m in response.get('models', [])]
+            # New API returns a ListResponse, old API a dict; both support .get
+            models = getattr(response, 'models', None) or response.get('models', [])
+            model_names = [m.get('model') or m.get('name') for m in models]
             
             if self.model not in model_names:
+                self._model_verified_at = None
                 logger.error(
                     f"Model {self.model} not found. Available: {model_names}"
                 )
                 return False
             
+            self._model_verified_at = time.monotonic()
             logger.info(f"Successfully connected to Ollama. Model {self.model} available.")
             return True
             
         except Exception as e:
+            self._model_verified_at = None
             logger.error(f"Failed to connect to Ollama: {e}")
             return False
@@ -2,18 +2,70 @@
 Session Manager for Interview Copilot.
 Manages interview context and pre-builds prompts for zero-latency Q&A.
 """
+from collections import deque
+from itertools import islice
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Deque, Dict, List, Optional, Tuple, Any
 import json
 import os
+import queue
+import threading
 import uuid
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 SESSION_DIR = os.path.expanduser("~/.interview-copilot")
+# Session layout: a write-once header, an append-only history log with one
+# exchange per line, and the per-turn Ollama context
 SESSION_FILE = os.path.join(SESSION_DIR, "session.json")
+HISTORY_FILE = os.path.join(SESSION_DIR, "history.jsonl")
+CONTEXT_FILE = os.path.join(SESSION_DIR, "context.json")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Encode obj as compact UTF-8 JSON (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Decode UTF-8 JSON (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_atomic(path: str, payload: bytes):
+    """
+    Write a file using a temporary file and atomic rename to prevent corruption.
+    
+    Args:
+        path: Destination file
+        payload: Bytes to write
+    """
+    temp_file = path + '.tmp'
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(payload)
+        # Atomic rename (on POSIX systems, this is atomic)
+        os.replace(temp_file, path)
+    except Exception:
+        # Clean up temp file if it exists
+        try:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        except Exception as cleanup_error:
+            logger.error(f"Failed to remove temp file: {cleanup_error}")
+        raise
 
 
 @dataclass
@@ -25,37 +77,50 @@ class InterviewSession:
     system_instruction: str
     created_at: str
     
-    # Pre-computed messages (built once at session start)
-    _system_message: Dict[str, str] = field(default_factory=dict)
+    # Pre-computed prompt templates (built once at session start)
     _context_template: str = ""
+    _followup_template: str = ""
+    
+    # Exchanges recorded so far and how many of them are on disk, so saves
+    # append only the new ones to the history log
+    _exchange_count: int = 0
+    _saved_count: int = 0
+    
+    # Ollama KV context returned by the last generate call, so follow-up
+    # questions only prefill the new prompt instead of the whole profile
+    ollama_context: Optional[List[int]] = None
+    ollama_model: str = ""
     
-    # Conversation history (limited to last N)
-    history: List[Tuple[str, str]] = field(default_factory=list)
+    # Conversation history (limited to last max_history; the deque evicts),
+    # kept as ready-made (user, assistant) chat messages
+    history: Deque[Tuple[Dict[str, str], Dict[str, str]]] = field(default_factory=deque)
     max_history: int = 3
     
-    def build_messages(self, question: str) -> List[Dict[str, str]]:
+    def __post_init__(self):
+        self.history = deque(self.history, maxlen=self.max_history)
+    
+    def build_prompt(self, question: str) -> str:
         """
-        Build complete Ollama message list with history.
-        This uses cached prompts - no re-processing of context.
+        Build the prompt for an Ollama generate call.
+        
+        Once Ollama has returned a context, the profile and previous
+        exchanges are already in its KV cache and only the question needs to
+        be sent. Without one (first turn, restored session, or a discarded
+        context) the prompt carries the background and the recent history.
         
         Args:
             question: The interview question
             
         Returns:
-            List of message dicts ready for ollama.chat()
+            Prompt string ready for ollama.generate()
         """
-        messages = [self._system_message]
-        
-        # Add recent conversation history (last 3 exchanges)
-        for q, a in self.history[-self.max_history:]:
-            messages.append({"role": "user", "content": q})
-            messages.append({"role": "assistant", "content": a})
-        
-        # Add current question with pre-built context template
-        user_prompt = self._context_template.format(question=question)
-        messages.append({"role": "user", "content": user_prompt})
-        
-        return messages
+        if self.ollama_context:
+            return self._followup_template.format(question=question)
+        history = "".join(
+            f"Interviewer's question: {u['content']}\nYour answer: {a['content']}\n\n"
+            for u, a in self.history
+        )
+        return self._context_template.format(history=history, question=question)
     
     def add_exchange(self, question: str, answer: str):
         """
@@ -65,9 +130,11 @@ class InterviewSession:
             question: The question that was asked
             answer: The generated answer
         """
-        self.history.append((question, answer))
-        if len(self.history) > self.max_history:
-            self.history = self.history[-self.max_history:]
+        self.history.append((
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer}
+        ))
+        self._exchange_count += 1
     
     def get_info(self) -> Dict[str, Any]:
         """
@@ -102,6 +169,17 @@ class SessionManager:
         self.default_system_instruction = default_system_instruction
         self.current_session: Optional[InterviewSession] = None
         self._ensure_session_dir()
+        
+        # Saves are encoded on the caller and written by a daemon thread,
+        # which merges whatever has queued up into one write
+        self._save_queue: queue.Queue = queue.Queue()
+        self._write_lock = threading.Lock()
+        self._save_thread = threading.Thread(
+            target=self._save_worker,
+            daemon=True,
+            name="SessionWriter"
+        )
+        self._save_thread.start()
     
     def _ensure_session_dir(self):
         """Create session directory if it doesn't exist."""
@@ -143,7 +221,7 @@ class SessionManager:
         self._rebuild_session_prompts(session)
         
         self.current_session = session
-        self.save_session()
+        self._queue_save(session, self._encode_header(session))
         logger.info(f"Created new session: {session.session_id[:8]}")
         
         return session
@@ -156,17 +234,44 @@ class SessionManager:
         Args:
             session: Session to build prompts for
         """
-        session._system_message = {"role": "system", "content": session.system_instruction}
-        session._context_template = f"""You have the following background (reference ONLY if directly relevant):
+        background = f"""You have the following background (reference ONLY if directly relevant):
 {session.profile}
 
-Target role: {session.job_context}
+Target role: {session.job_context}"""
+        
+        # Braces in the profile must survive str.format
+        escaped = background.replace("{", "{{").replace("}", "}}")
+        session._context_template = f"""{escaped}
 
-Interviewer's question: {{question}}
+{{history}}Interviewer's question: {{question}}
 
 Answer directly and concisely (2-3 sentences). Only mention your background if it directly relates to the question. Focus on answering WHAT is being asked.
 
 Answer:"""
+        session._followup_template = """Interviewer's question: {question}
+
+Answer directly and concisely (2-3 sentences). Only mention your background if it directly relates to the question. Focus on answering WHAT is being asked.
+
+Answer:"""
+    
+    @staticmethod
+    def _encode_header(session: InterviewSession) -> bytes:
+        """
+        Encode the fields that never change after creation.
+        
+        Args:
+            session: Session to encode
+            
+        Returns:
+            Header JSON for SESSION_FILE
+        """
+        return _dumps({
+            "session_id": session.session_id,
+            "profile": session.profile,
+            "job_context": session.job_context,
+            "system_instruction": session.system_instruction,
+            "created_at": session.created_at
+        })
     
     def has_active_session(self) -> bool:
         """
@@ -188,42 +293,92 @@ Answer:"""
     
     def save_session(self):
         """
-        Persist current session to disk using atomic write.
-        Uses a temporary file and atomic rename to prevent corruption.
+        Queue the current session for persistence without blocking on disk I/O.
+        
+        Only exchanges added since the last save are appended to the history
+        log; the header is written once when the session is created.
         """
         if not self.current_session:
             return
+        self._queue_save(self.current_session)
+    
+    def _queue_save(self, session: InterviewSession, header: Optional[bytes] = None):
+        """
+        Encode a session's unsaved state and hand it to the writer thread.
         
-        session = self.current_session
-        data = {
-            "session_id": session.session_id,
-            "profile": session.profile,
-            "job_context": session.job_context,
-            "system_instruction": session.system_instruction,
-            "created_at": session.created_at,
-            "history": session.history[-session.max_history:]  # Only save limited history
-        }
+        Encoding happens here, on the thread that mutates the session, so
+        the writer never reads the live session.
+        
+        Args:
+            session: Session to persist
+            header: Encoded header to (re)write; also restarts the history log
+        """
+        if header is not None:
+            session._saved_count = 0
         
-        # Use atomic write with temporary file
-        temp_file = SESSION_FILE + '.tmp'
+        # Exchanges since the last save that the bounded history still holds
+        unsaved = min(session._exchange_count - session._saved_count, len(session.history))
+        ts = datetime.now().isoformat()
+        lines = b"".join(
+            _dumps({"q": u["content"], "a": a["content"], "ts": ts}) + b"\n"
+            for u, a in islice(session.history, len(session.history) - unsaved, None)
+        )
+        session._saved_count = session._exchange_count
+        
+        context = _dumps({
+            "ollama_context": session.ollama_context,
+            "ollama_model": session.ollama_model
+        })
+        self._save_queue.put((session, header, lines, context))
+    
+    def _save_worker(self):
+        """Writer thread: persist queued saves until close() is called."""
+        running = True
+        while running:
+            batch = [self._save_queue.get()]
+            while True:
+                try:
+                    batch.append(self._save_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+            with self._write_lock:
+                self._write_batch(batch)
+    
+    def _write_batch(self, batch: List[Tuple[InterviewSession, Optional[bytes], bytes, bytes]]):
+        """
+        Merge queued saves of the current session into one write.
+        
+        Args:
+            batch: (session, header, history lines, context) in queue order
+        """
+        header = None
+        lines = []
+        context = None
+        for session, item_header, item_lines, item_context in batch:
+            # Skip saves of a session cleared or replaced meanwhile
+            if session is not self.current_session:
+                continue
+            if item_header is not None:
+                header, lines = item_header, []
+            lines.append(item_lines)
+            context = item_context  # Only the newest context matters
+        
+        if context is None:
+            return
         
         try:
-            # Write to temporary file first
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            
-            # Atomic rename (on POSIX systems, this is atomic)
-            os.replace(temp_file, SESSION_FILE)
+            if header is not None:
+                _write_atomic(SESSION_FILE, header)
+            with open(HISTORY_FILE, 'wb' if header is not None else 'ab') as f:
+                f.write(b"".join(lines))
+            _write_atomic(CONTEXT_FILE, context)
             logger.info("Session saved to disk")
             
         except Exception as e:
             logger.error(f"Failed to save session: {e}")
-            # Clean up temp file if it exists
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as cleanup_error:
-                logger.error(f"Failed to remove temp file: {cleanup_error}")
     
     def load_session(self) -> Optional[InterviewSession]:
         """
@@ -237,8 +392,8 @@ Answer:"""
             return None
         
         try:
-            with open(SESSION_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(SESSION_FILE, 'rb') as f:
+                data = _loads(f.read())
             
             # Create session object directly
             session = InterviewSession(
@@ -252,10 +407,29 @@ Answer:"""
             # Rebuild prompts from saved data (necessary after deserialization)
             self._rebuild_session_prompts(session)
             
+            # Sessions saved as a single file carry history and context in
+            # the header; they are rewritten in the split layout below
+            legacy = "history" in data
+            if legacy:
+                history = data["history"]
+                context = data
+            else:
+                history = self._read_history_tail(session.max_history)
+                context = self._read_context()
+            
             # Restore conversation history
-            session.history = [tuple(h) for h in data.get("history", [])]
+            for question, answer in history:
+                session.add_exchange(question, answer)
+            
+            # Restore Ollama KV context so follow-ups skip the profile prefill
+            session.ollama_context = context.get("ollama_context")
+            session.ollama_model = context.get("ollama_model", "")
             
             self.current_session = session
+            if legacy:
+                self._queue_save(session, self._encode_header(session))
+            else:
+                session._saved_count = session._exchange_count
             logger.info(f"Session restored: {session.session_id[:8]} with {len(session.history)} Q&A in history")
             return session
             
@@ -263,12 +437,70 @@ Answer:"""
             logger.error(f"Failed to load session: {e}")
             return None
     
-    def clear_session(self):
-        """Clear current session and delete saved file."""
-        self.current_session = None
-        if os.path.exists(SESSION_FILE):
+    @staticmethod
+    def _read_history_tail(limit: int) -> List[Tuple[str, str]]:
+        """
+        Read the last exchanges from the history log.
+        
+        One pass over the file that keeps only the last `limit` lines, so
+        only those are decoded regardless of how long the log has grown.
+        
+        Args:
+            limit: Number of exchanges to keep
+            
+        Returns:
+            (question, answer) pairs, oldest first
+        """
+        if not os.path.exists(HISTORY_FILE):
+            return []
+        
+        with open(HISTORY_FILE, 'rb') as f:
+            tail = deque(f, maxlen=limit)
+        
+        exchanges = []
+        for line in tail:
             try:
-                os.remove(SESSION_FILE)
-                logger.info("Session cleared")
-            except Exception as e:
-                logger.error(f"Failed to remove session file: {e}")
+                entry = _loads(line)
+            except ValueError:
+                logger.warning("Skipping unreadable history entry")
+                continue
+            exchanges.append((entry["q"], entry["a"]))
+        return exchanges
+    
+    @staticmethod
+    def _read_context() -> Dict[str, Any]:
+        """
+        Read the saved Ollama context.
+        
+        Returns:
+            Dictionary with ollama_context/ollama_model, empty if none saved
+        """
+        if not os.path.exists(CONTEXT_FILE):
+            return {}
+        with open(CONTEXT_FILE, 'rb') as f:
+            return _loads(f.read())
+    
+    def clear_session(self):
+        """Clear current session and delete saved files."""
+        with self._write_lock:
+            self.current_session = None
+            for path in (SESSION_FILE, HISTORY_FILE, CONTEXT_FILE):
+                if not os.path.exists(path):
+                    continue
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    logger.error(f"Failed to remove session file: {e}")
+            logger.info("Session cleared")
+    
+    def close(self, timeout: float = 2.0):
+        """
+        Stop the writer thread, letting a pending save finish first.
+        
+        Args:
+            timeout: Seconds to wait for the writer
+        """
+        self._save_queue.put(None)
+        self._save_thread.join(timeout=timeout)
+        if self._save_thread.is_alive():
+            logger.warning("Session writer busy, exiting without waiting")
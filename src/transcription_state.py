@@ -0,0 +1,15 @@
+"""
+Transcription state for Interview Copilot.
+Kept in its own module so it can be imported without loading the GUI toolkit.
+"""
+from enum import Enum
+
+
+class TranscriptionState(Enum):
+    """State machine for transcription status."""
+    IDLE = "Idle"
+    LISTENING = "Listening..."
+    TRANSCRIBING = "Transcribing..."
+    GENERATING = "Generating Answer..."
+    READY = "Ready"
+    ERROR = "Error"
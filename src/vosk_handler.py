@@ -4,18 +4,84 @@ Provides streaming transcription with ~200-500ms latency.
 """
 import os
 import json
+import hashlib
 import logging
+import re
+import shutil
+import sys
 import threading
-import queue
-import urllib.request
+import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Callable
+from typing import BinaryIO, Dict, List, Optional, Callable
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as TransportError
 from vosk import Model, KaldiRecognizer
 
 logger = logging.getLogger(__name__)
 
-# Model URLs and sizes
+# Queue marker asking the processing thread to end the current utterance
+_FORCE_FINAL = object()
+
+# Partial results are always {"partial" : "..."}; the common escape-free
+# case is sliced out with a regex, anything else goes through json.loads
+_PARTIAL_RE = re.compile(r'"partial"\s*:\s*"([^"\\]*)"')
+
+# The bundled en-us models are trained on 16 kHz mono int16 audio; other
+# rates make Kaldi resample every chunk
+MODEL_SAMPLE_RATE = 16000
+
+# Silence decoded once by a new recognizer so its first real chunk does not
+# pay for lazy decoder setup and first-touch page faults on the model
+WARMUP_SECONDS = 0.5
+
+# Chunk ring slots (power of two, so the slot index is a mask); ~30s of
+# the 500ms feeds the audio handler sends
+QUEUE_SLOTS = 64
+
+# Downloaded archives up to this size are extracted from memory (Python
+# 3.11+); larger ones spill to an anonymous temp file instead of a .zip in
+# the cache
+DOWNLOAD_SPOOL_BYTES = 64 << 20
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+DOWNLOAD_RETRIES = 3  # Interrupted downloads resume with a Range request
+DOWNLOAD_TIMEOUT = 30  # Seconds to connect / between received bytes
+
+# Kept-alive connection pool for model downloads, so a resume reuses the
+# TLS connection (requests also handles SSL properly on macOS)
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=2))
+
+# Archive members Vosk never reads; everything else (weights, graph, conf,
+# ivector) must exist as files since Model() loads the directory by path
+_MODEL_DOC_FILES = frozenset({"README", "README.md", "COPYING", "LICENSE", "LICENSE.txt"})
+
+# zlib releases the GIL while inflating, so members extract in parallel
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Loaded models by directory, shared by every handler in the process; a
+# Model is read-only and serves any number of recognizers
+_MODEL_CACHE: Dict[str, Model] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# Written into the model directory only after a complete extraction, so an
+# interrupted install is never mistaken for a usable model
+READY_MARKER = ".ready"
+
+# Suffix of the sibling directory a model is extracted into; it is moved onto
+# the model path in one rename only once every file is written
+STAGING_SUFFIX = ".partial"
+
+# Files every Vosk model directory has; installs made before the marker
+# existed are adopted when these are present. The decoding graph is either
+# a static HCLG.fst or the lookahead HCLr.fst + Gr.fst pair.
+_MODEL_REQUIRED_FILES = ("am/final.mdl", "conf/model.conf")
+_MODEL_GRAPHS = (("graph/HCLG.fst",), ("graph/HCLr.fst", "graph/Gr.fst"))
+
+# Model URLs and sizes; an entry may pin the archive's "sha256", otherwise
+# the digest is only logged
 VOSK_MODELS = {
     "small": {
         "url": "https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip",
@@ -30,6 +96,41 @@ VOSK_MODELS = {
 }
 
 
+class _DownloadReader:
+    """
+    Read-through view of a streamed response body for shutil.copyfileobj.
+    
+    Hashes and counts the bytes as they pass and reports whole-percent
+    progress; it is kept across resumed requests.
+    """
+    
+    def __init__(self, progress_callback: Optional[Callable[[int], None]] = None):
+        self.raw = None
+        self.progress_callback = progress_callback
+        self.total_size = 0
+        self.last_percent = -1
+        self.restart()
+    
+    def restart(self, total_size: int = 0):
+        """Start counting and hashing a full body from byte 0."""
+        self.digest = hashlib.sha256()
+        self.downloaded = 0
+        self.total_size = total_size
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        if data:
+            self.digest.update(data)
+            self.downloaded += len(data)
+            # Report only whole-percent changes
+            if self.progress_callback and self.total_size > 0:
+                percent = self.downloaded * 100 // self.total_size
+                if percent != self.last_percent:
+                    self.last_percent = percent
+                    self.progress_callback(min(percent, 100))
+        return data
+
+
 class VoskModelManager:
     """Manages Vosk model downloading and caching."""
     
@@ -46,6 +147,8 @@ class VoskModelManager:
         # Store models in user's cache directory
         self.cache_dir = Path.home() / ".cache" / "interview-copilot" / "vosk-models"
         self.model_path = self.cache_dir / self.model_info["name"]
+        self.ready_path = self.model_path / READY_MARKER
+        self.staging_path = self.cache_dir / (self.model_info["name"] + STAGING_SUFFIX)
         
         self._model: Optional[Model] = None
     
@@ -59,42 +162,44 @@ class VoskModelManager:
         Returns:
             Path to the model directory
         """
-        if self.model_path.exists():
+        if self.ready_path.exists():
             logger.info(f"Vosk model found at {self.model_path}")
             return self.model_path
         
+        # Extraction is staged and renamed into place, so a directory without
+        # the marker is a complete extraction interrupted before the marker
+        # was written, or an install from before the marker existed
+        if self.model_path.exists():
+            if self._has_model_files():
+                logger.info(f"Vosk model found at {self.model_path}, marking ready")
+                self.ready_path.touch()
+                return self.model_path
+            logger.warning(f"Incomplete Vosk model at {self.model_path}, reinstalling")
+            shutil.rmtree(self.model_path)
+        
         logger.info(f"Downloading Vosk {self.model_size} model (~{self.model_info['size_mb']}MB)...")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
-        zip_path = self.cache_dir / f"{self.model_info['name']}.zip"
-        
         try:
-            import requests
-            
-            # Download with progress using requests (handles SSL properly on macOS)
-            response = requests.get(self.model_info["url"], stream=True)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            
-            with open(zip_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if progress_callback and total_size > 0:
-                            percent = int((downloaded / total_size) * 100)
-                            progress_callback(min(percent, 100))
-            
-            # Extract
-            logger.info("Extracting model...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(self.cache_dir)
-            
-            # Clean up zip
-            zip_path.unlink()
+            # Extract straight from the download buffer rather than writing
+            # a .zip to the cache, reading it back and deleting it
+            with self._archive_buffer() as archive:
+                digest = self._download(archive, progress_callback)
+                
+                expected = self.model_info.get("sha256")
+                if expected and digest != expected:
+                    raise IOError(f"Model archive checksum mismatch (sha256 {digest})")
+                logger.info(f"Model archive sha256: {digest}")
+                
+                # Extract (zipfile verifies each member's CRC as it inflates)
+                logger.info("Extracting model...")
+                archive.seek(0)
+                try:
+                    self._extract_archive(archive)
+                finally:
+                    shutil.rmtree(self.staging_path, ignore_errors=True)
             
+            self.ready_path.touch()
             logger.info(f"Model ready at {self.model_path}")
             return self.model_path
             
@@ -102,11 +207,127 @@ class VoskModelManager:
             logger.error(f"Failed to download Vosk model: {e}")
             raise
     
+    @staticmethod
+    def _archive_buffer() -> BinaryIO:
+        """
+        Create the anonymous file the model archive is downloaded into.
+        
+        SpooledTemporaryFile only gained seekable() in Python 3.11, which
+        zipfile needs to read members; older versions go straight to disk.
+        """
+        if sys.version_info >= (3, 11):
+            return tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_BYTES)
+        return tempfile.TemporaryFile()
+    
+    def _has_model_files(self) -> bool:
+        """Check that the model directory holds the files Vosk needs."""
+        path = self.model_path
+        return (
+            all((path / name).is_file() for name in _MODEL_REQUIRED_FILES) and
+            any(all((path / name).is_file() for name in graph) for graph in _MODEL_GRAPHS)
+        )
+    
+    def _download(self, archive: BinaryIO,
+                  progress_callback: Optional[Callable[[int], None]] = None) -> str:
+        """
+        Download the model archive, resuming after interruptions.
+        
+        The archive is hashed in the same pass that writes it.
+        
+        Args:
+            archive: Writable file receiving the zip
+            progress_callback: Called with download percentage (0-100)
+            
+        Returns:
+            Hex sha256 of the archive
+        """
+        url = self.model_info["url"]
+        reader = _DownloadReader(progress_callback)
+        attempt = 0
+        
+        while True:
+            downloaded = reader.downloaded
+            headers = {"Range": f"bytes={downloaded}-"} if downloaded else None
+            try:
+                with _HTTP.get(url, stream=True, headers=headers,
+                               timeout=DOWNLOAD_TIMEOUT) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        # Full body (first request, or the server ignored
+                        # the range): start the archive over
+                        archive.seek(0)
+                        archive.truncate()
+                        reader.restart(int(response.headers.get('content-length', 0)))
+                    
+                    # Copy the raw body in large reads instead of looping
+                    # over iter_content chunks in Python
+                    response.raw.decode_content = True
+                    reader.raw = response.raw
+                    shutil.copyfileobj(reader, archive, DOWNLOAD_CHUNK_BYTES)
+                
+                if reader.downloaded >= reader.total_size:
+                    return reader.digest.hexdigest()
+                error = f"connection closed at {reader.downloaded}/{reader.total_size} bytes"
+            
+            except (requests.ConnectionError, requests.Timeout, TransportError) as e:
+                error = str(e)
+            
+            attempt += 1
+            if attempt > DOWNLOAD_RETRIES:
+                raise IOError(f"Model download failed: {error}")
+            logger.warning(f"Model download interrupted ({error}), resuming at {reader.downloaded} bytes")
+    
+    def _extract_archive(self, archive: BinaryIO):
+        """
+        Extract the model files from a downloaded archive in parallel.
+        
+        Worker threads share one ZipFile; zipfile serializes the positioned
+        reads of the underlying file and inflates outside its lock. Files
+        land in the staging directory, which is renamed onto the model path
+        once all of them are written.
+        
+        Args:
+            archive: Seekable file holding the zip
+        """
+        # Left over from an extraction that was killed part way
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+        
+        with zipfile.ZipFile(archive, 'r') as zip_ref:
+            # Member list comes from the central directory alone
+            members = [
+                info for info in zip_ref.infolist()
+                if not info.is_dir()
+                and info.filename.rsplit("/", 1)[-1] not in _MODEL_DOC_FILES
+            ]
+            # Largest first, so the big weight files set the critical path
+            members.sort(key=lambda info: info.file_size, reverse=True)
+            
+            def extract(info: zipfile.ZipInfo):
+                try:
+                    zip_ref.extract(info, self.staging_path)
+                except FileExistsError:
+                    # extract() checks then creates the parent directory,
+                    # so a sibling may have created it in between
+                    zip_ref.extract(info, self.staging_path)
+            
+            with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS,
+                                    thread_name_prefix="VoskExtract") as pool:
+                # list() re-raises the first extraction error, if any
+                list(pool.map(extract, members))
+        
+        # The archive holds a single top-level directory named after the model
+        os.replace(self.staging_path / self.model_info["name"], self.model_path)
+    
     def get_model(self) -> Model:
-        """Get or load the Vosk model."""
+        """Get or load the Vosk model (loaded once per process)."""
         if self._model is None:
-            model_path = self.ensure_model()
-            self._model = Model(str(model_path))
+            key = str(self.ensure_model())
+            with _MODEL_CACHE_LOCK:
+                model = _MODEL_CACHE.get(key)
+                if model is None:
+                    model = Model(key)
+                    _MODEL_CACHE[key] = model
+            self._model = model
         return self._model
 
 
@@ -119,34 +340,58 @@ class VoskStreamHandler:
     
     def __init__(
         self,
-        sample_rate: int = 16000,
+        sample_rate: int = MODEL_SAMPLE_RATE,
         on_partial: Optional[Callable[[str], None]] = None,
         on_final: Optional[Callable[[str], None]] = None,
-        model_size: str = "small"
+        model_size: str = "small",
+        grammar: Optional[List[str]] = None
     ):
         """
         Initialize the Vosk stream handler.
         
         Args:
-            sample_rate: Audio sample rate (default 16000 Hz)
+            sample_rate: Audio sample rate (default MODEL_SAMPLE_RATE)
             on_partial: Callback for partial (in-progress) transcriptions
             on_final: Callback for final (complete phrase) transcriptions
             model_size: "small" or "large"
+            grammar: Optional phrase list restricting the decoding graph
+                (small models only); None for unconstrained recognition
         """
+        if sample_rate != MODEL_SAMPLE_RATE:
+            logger.warning(
+                f"Vosk models expect {MODEL_SAMPLE_RATE} Hz audio, got {sample_rate} Hz"
+            )
         self.sample_rate = sample_rate
+        self._warmup_bytes = bytes(int(sample_rate * WARMUP_SECONDS) * 2)
         self.on_partial = on_partial
         self.on_final = on_final
         
+        # "[unk]" lets out-of-grammar speech map to a filler instead of
+        # being forced onto the nearest phrase
+        if grammar and "[unk]" not in grammar:
+            grammar = list(grammar) + ["[unk]"]
+        self.grammar = grammar
+        
         self.model_manager = VoskModelManager(model_size)
         self.recognizer: Optional[KaldiRecognizer] = None
         
         self._is_running = False
-        self._audio_queue: queue.Queue = queue.Queue()
         self._process_thread: Optional[threading.Thread] = None
         
+        # Single-producer/single-consumer ring of chunks: feed_audio and
+        # force_final run on the audio consumer thread, _process_loop on its
+        # own. Head and tail are running counts each stored by one thread,
+        # so no lock is taken per chunk.
+        self._slots: List[object] = [None] * QUEUE_SLOTS
+        self._head = 0  # Written by the producer
+        self._tail = 0  # Written by the processing thread
+        self._data_ready = threading.Event()
+        self._overruns = 0
+        
         # Track accumulated text
         self._current_text = ""
-        self._final_buffer = []
+        self._last_partial_raw = ""  # Vosk re-emits unchanged partials
+        self._final_text = ""  # Finals joined with spaces as they arrive
         
         logger.info(f"VoskStreamHandler initialized (model: {model_size})")
     
@@ -160,15 +405,41 @@ class VoskStreamHandler:
         Returns:
             True if successfully started
         """
+        # The ring and recognizer have a single consumer; a processor thread
+        # that outlived stop()'s join must exit before another one starts
+        if self._process_thread and self._process_thread.is_alive():
+            self._data_ready.set()
+            self._process_thread.join(timeout=2.0)
+            if self._process_thread.is_alive():
+                logger.error("Previous Vosk processing thread still running; not restarting")
+                return False
+        
         try:
             # Ensure model is downloaded
             model = self.model_manager.get_model()
             
-            # Create recognizer
-            self.recognizer = KaldiRecognizer(model, self.sample_rate)
-            self.recognizer.SetWords(True)
+            # Reuse the recognizer across stop/start; building one allocates
+            # the decoder state
+            if self.recognizer is not None:
+                self.recognizer.Reset()
+            else:
+                # Create recognizer (grammar mode shrinks the decoding lattice)
+                if self.grammar:
+                    self.recognizer = KaldiRecognizer(
+                        model, self.sample_rate, json.dumps(self.grammar)
+                    )
+                else:
+                    self.recognizer = KaldiRecognizer(model, self.sample_rate)
+                self.recognizer.SetWords(True)
+                self._warm_up()
+            self.clear_buffer()
             
-            # Start processing thread
+            # Start processing thread on an empty ring
+            self._slots = [None] * QUEUE_SLOTS
+            self._head = 0
+            self._tail = 0
+            self._overruns = 0
+            self._data_ready.clear()
             self._is_running = True
             self._process_thread = threading.Thread(
                 target=self._process_loop,
@@ -184,14 +455,24 @@ class VoskStreamHandler:
             logger.error(f"Failed to start VoskStreamHandler: {e}")
             return False
     
+    def _warm_up(self):
+        """Decode a short silence on a new recognizer, then discard it."""
+        self.recognizer.AcceptWaveform(self._warmup_bytes)
+        self.recognizer.Reset()
+    
     def stop(self):
         """Stop the stream handler."""
         self._is_running = False
         if self._process_thread:
-            self._audio_queue.put(None)  # Signal to stop
+            self._data_ready.set()  # Wake the processing thread to exit
             self._process_thread.join(timeout=2.0)
         logger.info("VoskStreamHandler stopped")
     
+    def close(self):
+        """Stop the handler and release the recognizer (app shutdown)."""
+        self.stop()
+        self.recognizer = None
+    
     def feed_audio(self, audio_data: bytes):
         """
         Feed audio data for processing.
@@ -200,22 +481,61 @@ class VoskStreamHandler:
             audio_data: Raw PCM audio bytes (16-bit, mono)
         """
         if self._is_running:
-            self._audio_queue.put(audio_data)
+            self._push(audio_data)
+    
+    def force_final(self):
+        """
+        End the current utterance without waiting for Vosk's endpointer.
+        
+        The flush is queued behind any audio already fed, and runs on the
+        processing thread since the recognizer is not thread-safe.
+        """
+        if self._is_running:
+            self._push(_FORCE_FINAL)
+    
+    def _push(self, item: object):
+        """Append a chunk or marker to the ring (producer thread only)."""
+        head = self._head
+        if head - self._tail >= QUEUE_SLOTS:
+            # Processing fell behind; drop rather than block the audio thread
+            self._overruns += 1
+            return
+        
+        self._slots[head & (QUEUE_SLOTS - 1)] = item
+        # Publish only after the slot is filled, and wake the processing
+        # thread only when the ring goes from empty to non-empty
+        self._head = head + 1
+        if self._tail == head:
+            self._data_ready.set()
     
     def _process_loop(self):
-        """Background thread for processing audio."""
+        """Background thread for processing audio; sleeps while the ring is empty."""
+        slots = self._slots
+        mask = QUEUE_SLOTS - 1
         while self._is_running:
+            tail = self._tail
+            if tail == self._head:
+                self._data_ready.clear()
+                # Re-check after clearing so a push in between is not missed
+                if tail == self._head and self._is_running:
+                    self._data_ready.wait()
+                continue
+            
+            audio_data = slots[tail & mask]
+            slots[tail & mask] = None
+            self._tail = tail + 1
+            
             try:
-                audio_data = self._audio_queue.get(timeout=0.1)
-                if audio_data is None:
-                    break
-                
-                self._process_chunk(audio_data)
+                if audio_data is _FORCE_FINAL:
+                    self._flush_final()
+                else:
+                    self._process_chunk(audio_data)
                 
-            except queue.Empty:
-                continue
             except Exception as e:
-                logger.error(f"Error in Vosk processing loop: {e}")
+                logger.error("Error in Vosk processing loop: %s", e)
+        
+        if self._overruns:
+            logger.warning("Dropped %d audio chunks (Vosk processing overrun)", self._overruns)
     
     def _process_chunk(self, audio_data: bytes):
         """Process a single audio chunk."""
@@ -225,20 +545,20 @@ class VoskStreamHandler:
         if self.recognizer.AcceptWaveform(audio_data):
             # Final result for this phrase
             result = json.loads(self.recognizer.Result())
-            text = result.get("text", "").strip()
-            
-            if text:
-                self._final_buffer.append(text)
-                self._current_text = ""
-                
-                if self.on_final:
-                    self.on_final(text)
-                    
-                logger.debug(f"Vosk final: {text}")
+            self._emit_final(result.get("text", "").strip())
         else:
-            # Partial result (still speaking)
-            partial = json.loads(self.recognizer.PartialResult())
-            text = partial.get("partial", "").strip()
+            # Partial result (still speaking); runs on most chunks, so no
+            # JSON decode unless the text contains escapes
+            raw = self.recognizer.PartialResult()
+            if raw == self._last_partial_raw:
+                return
+            self._last_partial_raw = raw
+            
+            match = _PARTIAL_RE.search(raw)
+            if match:
+                text = match.group(1).strip()
+            else:
+                text = json.loads(raw).get("partial", "").strip()
             
             if text and text != self._current_text:
                 self._current_text = text
@@ -246,21 +566,47 @@ class VoskStreamHandler:
                 if self.on_partial:
                     self.on_partial(text)
                     
-                logger.debug(f"Vosk partial: {text}")
+                logger.debug("Vosk partial: %s", text)
+    
+    def _flush_final(self):
+        """Finalize the in-progress utterance (after detected silence)."""
+        if not self.recognizer:
+            return
+        
+        result = json.loads(self.recognizer.FinalResult())
+        self._current_text = ""
+        self._emit_final(result.get("text", "").strip())
+    
+    def _emit_final(self, text: str):
+        """Record a final phrase and notify the callback."""
+        self._last_partial_raw = ""  # The next utterance starts fresh
+        if text:
+            if self._final_text:
+                self._final_text = self._final_text + " " + text
+            else:
+                self._final_text = text
+            self._current_text = ""
+            
+            if self.on_final:
+                self.on_final(text)
+                
+            logger.debug("Vosk final: %s", text)
     
     def get_buffer_text(self) -> str:
-        """Get all accumulated final text."""
-        return " ".join(self._final_buffer)
+        """Get all accumulated final text (maintained as finals arrive)."""
+        return self._final_text
     
     def clear_buffer(self):
         """Clear the accumulated text buffer."""
-        self._final_buffer.clear()
+        self._final_text = ""
         self._current_text = ""
+        self._last_partial_raw = ""
     
     def pop_buffer(self) -> str:
         """Get and clear the buffer (atomic operation)."""
-        text = self.get_buffer_text()
-        self.clear_buffer()
+        text, self._final_text = self._final_text, ""
+        self._current_text = ""
+        self._last_partial_raw = ""
         return text
     
     def get_current_partial(self) -> str: